@@ -4,7 +4,9 @@
 # In[109]:
 
 
+import os
 import random
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 import numpy as np
 from faker import Faker
@@ -20,6 +22,14 @@ NUM_TRANSMISSION_LINES = 200
 NUM_SUBSTATIONS = 500
 NUM_DISTRIBUTION_NETWORKS = 1000
 NUM_CUSTOMERS = 1000000
+NUM_DAYS = (END_DATE - START_DATE).days + 1
+NUM_MONTHS = (END_DATE.year - START_DATE.year) * 12 + END_DATE.month - START_DATE.month + 1
+SEED = 6750
+NUM_WORKERS = os.cpu_count()
+CHUNK_SIZE = 1000  # customers/meters per pipeline chunk (and per shard)
+WINDOW_MONTHS = 12  # months of readings generated at a time per chunk
+OUTPUT_DIR = '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data'
+OUTPUT_FORMAT = 'csv'  # or 'parquet' (needs pyarrow)
 
 # Lists of major US cities and their approximate populations
 CITIES = [
@@ -42,16 +52,54 @@ CITIES = [
     ("New Orleans", 383997), ("Wichita", 389255)
 ]
 
-# Events that might affect energy consumption
+# State of each city in CITIES
+CITY_STATES = {
+    "New York City": "NY", "Los Angeles": "CA", "Chicago": "IL", "Houston": "TX",
+    "Phoenix": "AZ", "Philadelphia": "PA", "San Antonio": "TX", "San Diego": "CA",
+    "Dallas": "TX", "San Jose": "CA", "Austin": "TX", "Jacksonville": "FL",
+    "Fort Worth": "TX", "Columbus": "OH", "San Francisco": "CA", "Charlotte": "NC",
+    "Indianapolis": "IN", "Seattle": "WA", "Denver": "CO", "Washington": "DC",
+    "Boston": "MA", "El Paso": "TX", "Detroit": "MI", "Nashville": "TN",
+    "Portland": "OR", "Memphis": "TN", "Oklahoma City": "OK", "Las Vegas": "NV",
+    "Louisville": "KY", "Baltimore": "MD", "Milwaukee": "WI", "Albuquerque": "NM",
+    "Tucson": "AZ", "Fresno": "CA", "Sacramento": "CA", "Mesa": "AZ",
+    "Kansas City": "MO", "Atlanta": "GA", "Long Beach": "CA", "Omaha": "NE",
+    "Raleigh": "NC", "Colorado Springs": "CO", "Miami": "FL", "Virginia Beach": "VA",
+    "Oakland": "CA", "Minneapolis": "MN", "Tulsa": "OK", "Arlington": "TX",
+    "New Orleans": "LA", "Wichita": "KS"
+}
+
+# Events that might affect energy consumption: (start, end, name, effect, region)
+# where region is None for national events, a state code or a city name
 EVENTS = [
-    ("2020-03-15", "2020-06-30", "COVID-19 Lockdowns", -0.2),
-    ("2021-02-13", "2021-02-17", "Texas Winter Storm", 0.5),
-    ("2021-06-15", "2021-09-15", "Summer Heatwave", 0.3),
-    ("2022-06-01", "2022-08-31", "Energy Price Spike", -0.1),
-    ("2023-01-01", "2023-12-31", "Economic Recession", -0.15),
-    ("2024-06-01", "2024-08-31", "Olympic Games", 0.2)
+    ("2020-03-15", "2020-06-30", "COVID-19 Lockdowns", -0.2, None),
+    ("2021-02-13", "2021-02-17", "Texas Winter Storm", 0.5, "TX"),
+    ("2021-06-15", "2021-09-15", "Summer Heatwave", 0.3, None),
+    ("2022-06-01", "2022-08-31", "Energy Price Spike", -0.1, None),
+    ("2023-01-01", "2023-12-31", "Economic Recession", -0.15, None),
+    ("2024-06-01", "2024-08-31", "Olympic Games", 0.2, None)
 ]
 
+# Output columns of every generated table
+TABLE_COLUMNS = {
+    'assets': ['asset_id', 'asset_type'],
+    'power_plants': ['plant_id', 'plant_name', 'capacity', 'location', 'asset_id'],
+    'transmission_lines': ['line_id', 'line_name', 'voltage', 'length', 'plant_id', 'asset_id'],
+    'substations': ['substation_id', 'substation_name', 'capacity', 'location', 'asset_id'],
+    'distribution_networks': ['network_id', 'network_name', 'voltage', 'substation_id', 'asset_id'],
+    'customers': ['customer_id', 'customer_name', 'address', 'network_id'],
+    'meters': ['meter_id', 'meter_type', 'installation_date', 'customer_id'],
+    'consumption': ['consumption_id', 'meter_id', 'reading_date', 'consumption'],
+    'billing': ['bill_id', 'customer_id', 'billing_date', 'amount', 'consumption_id'],
+    'outages': ['outage_id', 'start_time', 'end_time', 'description', 'asset_id'],
+}
+
+# Date column the Parquet output of a table is partitioned by (year=/month=)
+PARTITION_DATE_COLUMNS = {
+    'consumption': 'reading_date',
+    'billing': 'billing_date',
+}
+
 
 
 
@@ -81,16 +129,97 @@ def generate_distribution_network(network_id, substations):
     substation = random.choice(substations)
     return (network_id, f"Network {network_id}", 11.0, substation[0], network_id)
 
-def generate_customer(customer_id, networks):
-    network = random.choice(networks)
-    city = next(sub for sub in substations if sub[0] == network[3])[2]
-    return (customer_id, fake.name(), fake.address().replace('\n', ', ') + f", {city}", network[0])
+def generate_customer(customer_id, topology):
+    return generate_customers(1, topology, customer_id)[0]
 
 def generate_meter(meter_id, customer_id):
     meter_types = ["Smart", "Analog", "Digital"]
     return (meter_id, random.choice(meter_types), fake.date_between(start_date=START_DATE, end_date=END_DATE), customer_id)
 
-def generate_consumption(consumption_id, meter_id, date, base_consumption):
+# Event calendar: EVENTS compiled once into a (city, day) table of event
+# multipliers covering START_DATE..END_DATE, so looking up the event effect of a
+# reading is a single index. The last row is for readings with no known city and
+# only carries national events.
+CITY_INDEX = {city: i for i, (city, _) in enumerate(CITIES)}
+NO_CITY = len(CITIES)
+
+def compile_event_calendar(events):
+    # Difference array per row: +effect on the start day, -effect the day after
+    # the end, then a running sum along the days. Cost is O(events + cities * days)
+    # however many events overlap.
+    calendar_start = np.datetime64(START_DATE.date(), 'D')
+    diff = np.zeros((len(CITIES) + 1, NUM_DAYS + 1))
+    for event_start, event_end, _, effect, region in events:
+        first = max(int((np.datetime64(event_start) - calendar_start).astype(np.int64)), 0)
+        last = min(int((np.datetime64(event_end) - calendar_start).astype(np.int64)), NUM_DAYS - 1)
+        if first > last:
+            continue
+        if region is None:
+            rows = slice(None)
+        elif region in CITY_INDEX:
+            rows = [CITY_INDEX[region]]
+        else:
+            rows = [CITY_INDEX[city] for city, state in CITY_STATES.items() if state == region]
+        diff[rows, first] += effect
+        diff[rows, last + 1] -= effect
+    return 1 + np.cumsum(diff, axis=1)[:, :NUM_DAYS]
+
+EVENT_CALENDAR = compile_event_calendar(EVENTS)
+
+def city_indexes(cities):
+    return np.array([NO_CITY if city is None else CITY_INDEX[city] for city in cities], dtype=np.int64)
+
+def calendar_day_index(dates):
+    # Day index of dates from START_DATE; ids and event effects only exist for
+    # days in START_DATE..END_DATE
+    day_index = (np.asarray(dates, dtype='datetime64[D]') - np.datetime64(START_DATE.date(), 'D')).astype(np.int64)
+    if np.any((day_index < 0) | (day_index >= NUM_DAYS)):
+        raise ValueError(f"dates must be between {START_DATE.date()} and {END_DATE.date()}")
+    return day_index
+
+def event_effect_for(city_idx, dates):
+    return EVENT_CALENDAR[city_idx, calendar_day_index(dates)]
+
+# Counter-based random numbers: every draw is a hash of (SEED, stream, meter_id,
+# counter), where the counter is the reading day or billing month. Any
+# meter-day can be regenerated on its own without replaying earlier draws.
+STREAM_TEMPERATURE = 1
+STREAM_DAILY = 3
+STREAM_BASE = 4
+STREAM_RATE = 5
+# A normal's second (phase) uniform is drawn on stream | PHASE_STREAM_BIT,
+# which no plain stream (all below 0x80) can collide with
+PHASE_STREAM_BIT = 0x80
+
+def _splitmix64(x):
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+def counter_uniform(stream, meter_ids, counters, seed=SEED):
+    # Uniform [0, 1) per (meter_id, counter) pair
+    key = _splitmix64(np.full(1, (seed << 8) ^ stream, dtype=np.uint64))
+    x = _splitmix64(key ^ np.asarray(meter_ids, dtype=np.int64).astype(np.uint64))
+    x = _splitmix64(x ^ np.asarray(counters, dtype=np.int64).astype(np.uint64))
+    return (x >> np.uint64(11)) * (1.0 / (1 << 53))
+
+def counter_normal(stream, meter_ids, counters, seed=SEED):
+    # Standard normal per (meter_id, counter) pair (Box-Muller)
+    u1 = 1.0 - counter_uniform(stream, meter_ids, counters, seed)
+    u2 = counter_uniform(stream | PHASE_STREAM_BIT, meter_ids, counters, seed)
+    return np.sqrt(-2.0 * np.log(u1)) * np.cos(2 * np.pi * u2)
+
+def base_consumption_for(meter_ids):
+    return 200 + 800 * counter_uniform(STREAM_BASE, meter_ids, 0)  # kWh per month
+
+def _day_counter(dates):
+    return np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+
+def _month_counter(dates):
+    return np.asarray(dates, dtype='datetime64[M]').astype(np.int64)
+
+def generate_consumption(consumption_id, meter_id, date, base_consumption, city=None):
     # Strong seasonal variation
     month = date.month
     day_of_year = date.timetuple().tm_yday
@@ -102,37 +231,146 @@ def generate_consumption(consumption_id, meter_id, date, base_consumption):
                                  0.5 * np.sin((day_of_year - 15) * 4 * np.pi / 365))
     
     # Temperature variation (approximate, you may want to use actual temperature data for more accuracy)
-    temp_variation = random.gauss(0, 0.1)  # Random normal distribution
+    temp_variation = 0.1 * counter_normal(STREAM_TEMPERATURE, meter_id, _day_counter(date))[0]  # Random normal distribution
     seasonal_factor += temp_variation
     
     # Weekly pattern (higher consumption on weekdays)
     weekday_factor = 1.1 if date.weekday() < 5 else 0.9
     
     # Apply random daily variation
-    daily_variation = random.uniform(0.9, 1.1)
+    daily_variation = 0.9 + 0.2 * counter_uniform(STREAM_DAILY, meter_id, _day_counter(date))[0]
     
-    # Apply event effects
-    event_effect = 1
-    for event_start, event_end, _, effect in EVENTS:
-        # print(datetime.strptime(event_end, "%Y-%m-%d"))
-        # print(event_start)
-        # print(type(event_start))
-        # print(event_end)
-        # print(type(event_end))
-        if datetime.strptime(event_start, "%Y-%m-%d").date() <= date <= datetime.strptime(event_end, "%Y-%m-%d").date():
-            event_effect += effect
-        # if event_start <= date <= event_end:
-        #     event_effect += effect
+    # Apply event effects (national plus those of the meter's city/state)
+    event_effect = event_effect_for(CITY_INDEX.get(city, NO_CITY), date)
     
     # Calculate final consumption
     consumption = base_consumption * seasonal_factor * weekday_factor * daily_variation * event_effect
     
     return (consumption_id, meter_id, date, max(0, consumption))
 
-def generate_billing(bill_id, customer_id, consumption_id, consumption, date):
-    rate = random.uniform(0.1, 0.2)  # $/kWh
-    amount = consumption * rate
-    return (bill_id, customer_id, date, amount, consumption_id)
+def generate_consumption_batch(meter_ids, base_consumptions, installation_dates, start_date=None, end_date=None,
+                               meter_cities=None):
+    # Vectorized version of generate_consumption for a whole block of meters.
+    # Every meter gets one reading per day from its installation date (or
+    # start_date, if later) through END_DATE (or end_date, if earlier), with the
+    # window clamped to START_DATE..END_DATE. Rows are laid out meter by meter
+    # (same order as the per-row loop), so the result is a ragged block returned
+    # as column arrays:
+    # (consumption_ids, meter_ids, reading_dates, consumption)
+    # consumption_id and the random variation are derived from (meter_id, day),
+    # so a reading doesn't depend on how meters are split into blocks or shards
+    # or on which window it was generated in. meter_cities (CITY_INDEX rows, one
+    # per meter) scopes regional events; without it only national events apply.
+    meter_ids = np.asarray(meter_ids)
+    base_consumptions = np.asarray(base_consumptions, dtype=np.float64)
+    start_days = np.maximum(np.asarray(installation_dates, dtype='datetime64[D]'),
+                            np.datetime64(START_DATE.date(), 'D'))
+    if start_date is not None:
+        start_days = np.maximum(start_days, np.datetime64(start_date, 'D'))
+    end_day = np.datetime64(END_DATE.date(), 'D')
+    if end_date is not None:
+        end_day = min(end_day, np.datetime64(end_date, 'D'))
+
+    # Ragged layout: meter_index says which meter a row belongs to, day_offset
+    # how many days after that meter's installation date it is
+    counts = np.maximum((end_day - start_days).astype(np.int64) + 1, 0)
+    total = int(counts.sum())
+    meter_index = np.repeat(np.arange(len(meter_ids)), counts)
+    day_offset = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    dates = start_days[meter_index] + day_offset
+
+    # The seasonal and weekday factors only depend on the calendar day, so work
+    # them out once per day in the block and gather them per row
+    first_day = start_days.min() if len(start_days) else end_day
+    days = np.arange(first_day, end_day + 1, dtype='datetime64[D]')
+    day_of_year = (days - days.astype('datetime64[Y]')).astype(np.int64) + 1
+    seasonal_by_day = 1 + 0.5 * (np.sin((day_of_year - 15) * 2 * np.pi / 365) +
+                                 0.5 * np.sin((day_of_year - 15) * 4 * np.pi / 365))
+    # 1970-01-01 was a Thursday, so (epoch day + 3) % 7 is Monday=0 like date.weekday()
+    weekday_by_day = np.where((days.astype(np.int64) + 3) % 7 < 5, 1.1, 0.9)
+    meter_cities = np.full(len(meter_ids), NO_CITY) if meter_cities is None else np.asarray(meter_cities)
+
+    event_effect = event_effect_for(meter_cities[meter_index], dates)
+    meter_ids = meter_ids[meter_index]
+    day_index = (dates - first_day).astype(np.int64)
+    day_counter = _day_counter(dates)
+    seasonal_factor = seasonal_by_day[day_index] + 0.1 * counter_normal(STREAM_TEMPERATURE, meter_ids, day_counter)
+    daily_variation = 0.9 + 0.2 * counter_uniform(STREAM_DAILY, meter_ids, day_counter)
+    consumption = (base_consumptions[meter_index] * seasonal_factor * weekday_by_day[day_index] *
+                   daily_variation * event_effect)
+    np.maximum(consumption, 0, out=consumption)
+
+    consumption_ids = consumption_id_for(meter_ids, dates)
+    return (consumption_ids, meter_ids, dates, consumption)
+
+def consumption_id_for(meter_ids, dates):
+    return (np.asarray(meter_ids, dtype=np.int64) - 1) * NUM_DAYS + calendar_day_index(dates) + 1
+
+def bill_id_for(meter_ids, months):
+    month_index = (np.asarray(months, dtype='datetime64[M]') - np.datetime64(START_DATE.date(), 'M')).astype(np.int64)
+    return (np.asarray(meter_ids, dtype=np.int64) - 1) * NUM_MONTHS + month_index + 1
+
+def stream_billing(consumption_blocks, meter_customers):
+    # Streaming monthly billing: consumes consumption blocks (as returned by
+    # generate_consumption_batch) in meter/date order, keeps a running total for
+    # the open meter-month and yields bill rows as column arrays
+    # (bill_ids, customer_ids, billing_dates, amounts, consumption_ids) for every
+    # month that has closed. A bill is dated on the last reading of its month
+    # and points at that reading's consumption_id. The rate is keyed by
+    # (meter_id, month), like the consumption noise.
+    carry = None  # (meter_id, month, consumption_id, date, total) of the open meter-month
+
+    def emit(meter_ids, consumption_ids, dates, totals):
+        bill_ids = bill_id_for(meter_ids, dates)
+        customer_ids = np.fromiter((meter_customers[m] for m in meter_ids.tolist()), dtype=np.int64, count=len(meter_ids))
+        rates = 0.1 + 0.1 * counter_uniform(STREAM_RATE, meter_ids, _month_counter(dates))  # $/kWh
+        amounts = totals * rates
+        return (bill_ids, customer_ids, dates, amounts, consumption_ids)
+
+    for consumption_ids, meter_ids, dates, values in consumption_blocks:
+        if len(meter_ids) == 0:
+            continue
+        months = dates.astype('datetime64[M]')
+        starts = np.flatnonzero(np.r_[True, (meter_ids[1:] != meter_ids[:-1]) | (months[1:] != months[:-1])])
+        ends = np.r_[starts[1:], len(meter_ids)] - 1
+        group_meters, group_months = meter_ids[starts], months[starts]
+        group_ids, group_dates = consumption_ids[ends], dates[ends]
+        group_totals = np.add.reduceat(values, starts)
+
+        if carry is not None:
+            if carry[0] == group_meters[0] and carry[1] == group_months[0]:
+                group_totals[0] += carry[4]
+            else:
+                yield emit(np.array([carry[0]]), np.array([carry[2]]), np.array([carry[3]]), np.array([carry[4]]))
+
+        # Every group but the last is followed by another meter-month, so it is closed
+        if len(starts) > 1:
+            yield emit(group_meters[:-1], group_ids[:-1], group_dates[:-1], group_totals[:-1])
+        carry = (group_meters[-1], group_months[-1], group_ids[-1], group_dates[-1], group_totals[-1])
+
+    if carry is not None:
+        yield emit(np.array([carry[0]]), np.array([carry[2]]), np.array([carry[3]]), np.array([carry[4]]))
+
+# Lazy accessors: regenerate the readings or bills of any meters over any window
+# from the meter rows alone, e.g. to debug one meter's bill or re-emit a lost
+# partition. Cost is proportional to the window, not to what came before it.
+
+def consumption_window(meters, start_date=None, end_date=None, cities=None):
+    # cities: the city of each meter (None if unknown), for regional events
+    meter_ids = np.array([meter[0] for meter in meters])
+    meter_cities = None if cities is None else city_indexes(cities)
+    return generate_consumption_batch(meter_ids, base_consumption_for(meter_ids) / 30,
+                                      [meter[2] for meter in meters], start_date, end_date, meter_cities)
+
+def billing_window(meters, start_date=None, end_date=None, cities=None):
+    # Bills need every reading of their month, so widen the window to whole months
+    if start_date is not None:
+        start_date = np.datetime64(start_date, 'M').astype('datetime64[D]')
+    if end_date is not None:
+        end_date = (np.datetime64(end_date, 'M') + 1).astype('datetime64[D]') - 1
+    meter_customers = {meter[0]: meter[3] for meter in meters}
+    bills = list(stream_billing([consumption_window(meters, start_date, end_date, cities)], meter_customers))
+    return tuple(map(np.concatenate, zip(*bills))) if bills else ()
 
 def generate_outage(outage_id, assets):
     asset = random.choice(assets)
@@ -140,158 +378,251 @@ def generate_outage(outage_id, assets):
     end_time = start_time + timedelta(hours=random.randint(1, 24))
     return (outage_id, start_time, end_time, f"Outage on {asset[1]}", asset[0])
 
-def generate_customers(num_customers, distribution_networks):
-    customers = []
-    # Create a dictionary to map cities to their distribution networks
-    city_to_networks = {}
-    for network in distribution_networks:
-        city = next(sub for sub in substations if sub[0] == network[3])[3]
-        if city not in city_to_networks:
-            city_to_networks[city] = []
-        city_to_networks[city].append(network)
-    
-    # Generate customers
-    for i in range(1, num_customers + 1):
-        # Choose a city based on population
-        city, population = random.choices(CITIES, weights=[city[1] for city in CITIES])[0]
-        
-        # If the chosen city has no networks, choose the nearest city that does
-        while city not in city_to_networks:
-            city, population = random.choice(CITIES)
-        
-        # Choose a network in the selected city
-        network = random.choice(city_to_networks[city])
-        
-        customers.append((i, fake.name(), fake.address().replace('\n', ', ') + f", {city}", network[0]))
-        #print(customers)
-    
-    return customers
+# Customer identities: pools of first/last names, street names and per-city zip
+# codes are drawn from a SEED-ed Faker once per process, then whole name and
+# address columns are sampled from them instead of calling Faker per customer.
+IDENTITY_POOL_SIZE = 1000
+STREET_POOL_SIZE = 10000
+ZIPS_PER_CITY = 25
+_identity_pools = None
+
+def identity_pools():
+    global _identity_pools
+    if _identity_pools is None:
+        pool_fake = Faker()
+        pool_fake.seed_instance(SEED)
+        _identity_pools = {
+            'first_names': np.array([pool_fake.first_name() for _ in range(IDENTITY_POOL_SIZE)], dtype=object),
+            'last_names': np.array([pool_fake.last_name() for _ in range(IDENTITY_POOL_SIZE)], dtype=object),
+            # "number street" and ", city, state zip" halves of an address
+            'streets': np.array([f"{number} {pool_fake.street_name()}"
+                                 for number in np.random.default_rng(SEED).integers(1, 10000, STREET_POOL_SIZE)],
+                                dtype=object),
+            'localities': np.array([[f", {city}, {CITY_STATES[city]} {pool_fake.zipcode_in_state(CITY_STATES[city])}"
+                                     for _ in range(ZIPS_PER_CITY)] for city, _ in CITIES], dtype=object),
+        }
+    return _identity_pools
+
+def generate_identities(city_idx, rng):
+    # Names and "number street, city, state zip" addresses for customers living
+    # in the given cities (indexes into CITIES), as two object arrays
+    pools = identity_pools()
+    n = len(city_idx)
+    names = (pools['first_names'][rng.integers(0, IDENTITY_POOL_SIZE, n)] + " " +
+             pools['last_names'][rng.integers(0, IDENTITY_POOL_SIZE, n)])
+    addresses = (pools['streets'][rng.integers(0, STREET_POOL_SIZE, n)] +
+                 pools['localities'][city_idx, rng.integers(0, ZIPS_PER_CITY, n)])
+    return names, addresses
+
+# Topology index: the substation -> city and city -> networks lookups customers
+# are placed with, built once per network layout. Networks are grouped by city
+# so a city's networks are network_ids[offsets[c]:offsets[c] + counts[c]].
+
+def build_topology_index(substations, distribution_networks):
+    substation_cities = {substation[0]: substation[3] for substation in substations}
+    network_cities = {network[0]: substation_cities[network[3]] for network in distribution_networks}
+    network_ids = np.array(list(network_cities), dtype=np.int64)
+    city_idx = city_indexes(list(network_cities.values()))
+    order = np.argsort(city_idx, kind='stable')
+    counts = np.bincount(city_idx, minlength=len(CITIES))
+
+    # Cities are drawn by population; a draw landing on a city without networks
+    # is redrawn uniformly, so that mass is spread evenly over the others
+    weights = np.array([population for _, population in CITIES], dtype=np.float64)
+    served = counts > 0
+    probabilities = np.where(served, weights / weights.sum() + weights[~served].sum() / weights.sum() / served.sum(), 0)
+
+    return {
+        'network_cities': network_cities,
+        'network_ids': network_ids[order],
+        'offsets': np.cumsum(counts) - counts,
+        'counts': counts,
+        'cum_weights': np.cumsum(probabilities),
+    }
+
+def generate_customers(num_customers, topology, first_customer_id=1):
+    # Seeded from random so a shard's customers follow its seed
+    rng = np.random.default_rng(random.getrandbits(64))
+
+    # Choose a city based on population, then a network in that city
+    cum_weights = topology['cum_weights']
+    city_idx = np.searchsorted(cum_weights, rng.random(num_customers) * cum_weights[-1], side='right')
+    city_idx = np.minimum(city_idx, len(CITIES) - 1)
+    picks = topology['offsets'][city_idx] + (rng.random(num_customers) * topology['counts'][city_idx]).astype(np.int64)
+    network_ids = topology['network_ids'][picks]
+
+    names, addresses = generate_identities(city_idx, rng)
+    customer_ids = range(first_customer_id, first_customer_id + num_customers)
+    return list(zip(customer_ids, names.tolist(), addresses.tolist(), network_ids.tolist()))
+
+# Generation pipeline: every stage consumes and yields chunks, where a chunk is a
+# dict of table name -> rows (a list of tuples or a tuple of column arrays) for
+# CHUNK_SIZE customers, so only one chunk is ever held in memory. Readings and
+# bills follow their customers as further chunks, one per WINDOW_MONTHS window,
+# so memory doesn't grow with the date range either.
+
+def seed_shard(shard):
+    # Every chunk/shard reseeds random and Faker from (SEED, shard), so its
+    # customers and meters only depend on its index and not on which process
+    # builds it or what ran before it (readings and bills use the counter-based
+    # draws above)
+    shard_seed = int(np.random.SeedSequence([SEED, shard]).generate_state(1)[0])
+    random.seed(shard_seed)
+    fake.seed_instance(shard_seed)
+
+def iter_customer_chunks(num_customers, topology, shards=None):
+    num_shards = (num_customers + CHUNK_SIZE - 1) // CHUNK_SIZE
+    for shard in (range(num_shards) if shards is None else shards):
+        first_id = shard * CHUNK_SIZE + 1
+        count = min(CHUNK_SIZE, num_customers - first_id + 1)
+        seed_shard(shard)
+        yield {'customers': generate_customers(count, topology, first_id)}
+
+def add_meters(chunks):
+    # One meter per customer, sharing the customer's id
+    for chunk in chunks:
+        chunk['meters'] = [generate_meter(customer[0], customer[0]) for customer in chunk['customers']]
+        yield chunk
+
+def month_windows(window_months=WINDOW_MONTHS):
+    # (start, end) dates of consecutive windows of whole months covering START_DATE..END_DATE
+    start = np.datetime64(START_DATE.date(), 'M')
+    while start <= np.datetime64(END_DATE.date(), 'M'):
+        end = start + window_months
+        yield start.astype('datetime64[D]'), end.astype('datetime64[D]') - 1
+        start = end
+
+def add_consumption(chunks, network_cities=None):
+    # network_cities maps network_id -> city so regional events reach the
+    # meters of that city; meters and customers of a chunk line up one to one.
+    # chunk['consumption'] is a lazy iterator of one block per month window.
+    for chunk in chunks:
+        cities = None
+        if network_cities is not None:
+            cities = [network_cities[customer[3]] for customer in chunk['customers']]
+        chunk['consumption'] = (consumption_window(chunk['meters'], start, end, cities)
+                                for start, end in month_windows())
+        yield chunk
+
+def add_billing(chunks):
+    # Yields each chunk's customers and meters, then its consumption blocks as
+    # they are generated, each followed by the bills it closes. stream_billing
+    # carries the open meter-months from one block to the next.
+    for chunk in chunks:
+        meter_customers = {meter[0]: meter[3] for meter in chunk['meters']}
+        blocks = chunk.pop('consumption')
+        yield chunk
+
+        pending = []  # blocks read by stream_billing but not yet passed on
+
+        def read_blocks():
+            for block in blocks:
+                pending.append(block)
+                yield block
+
+        for bills in stream_billing(read_blocks(), meter_customers):
+            while pending:
+                yield {'consumption': pending.pop(0)}
+            yield {'billing': bills}
+        for block in pending:
+            yield {'consumption': block}
+
+def table_frame(table, rows):
+    columns = TABLE_COLUMNS[table]
+    if isinstance(rows, tuple):
+        return pd.DataFrame(dict(zip(columns, rows)), columns=columns)
+    return pd.DataFrame(rows, columns=columns)
+
+def write_chunks(chunks, output_dir=OUTPUT_DIR, part=None, output_format=OUTPUT_FORMAT):
+    # Final stage: write every table of every chunk as it arrives. With part
+    # set, each table goes to its own <table>/part-NNNNN.csv file. Parquet
+    # output is always a <table>/ dataset directory with one file per chunk.
+    written = set()
+    for i, chunk in enumerate(chunks):
+        for table, rows in chunk.items():
+            df = table_frame(table, rows)
+            if output_format == 'parquet':
+                save_to_parquet(df, f"{output_dir}/{table}", PARTITION_DATE_COLUMNS.get(table),
+                                f"part-{part or 0:05d}-{i:05d}")
+            elif part is None:
+                save_to_csv(df, f"{output_dir}/{table}.csv", append=table in written)
+            else:
+                os.makedirs(f"{output_dir}/{table}", exist_ok=True)
+                save_to_csv(df, f"{output_dir}/{table}/part-{part:05d}.csv", append=table in written)
+            written.add(table)
+
+def save_to_csv(df, filename, append=False):
+    df.to_csv(filename, index=False, mode='a' if append else 'w', header=not append)
+
+def save_to_parquet(df, path, date_column=None, basename='part-00000'):
+    # Snappy-compressed Parquet with *_date columns stored as dates. With
+    # date_column set the dataset is partitioned into year=/month= directories,
+    # so scans of a date range only read the matching files.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    partition_cols = None
+    if date_column is not None:
+        dates = pd.to_datetime(df[date_column])
+        df = df.assign(year=dates.dt.year, month=dates.dt.month)
+        partition_cols = ['year', 'month']
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.cast(pa.schema([pa.field(field.name, pa.date32()) if field.name.endswith('_date') else field
+                                  for field in table.schema], metadata=table.schema.metadata))
+    pq.write_to_dataset(table, path, partition_cols=partition_cols, basename_template=basename + '-{i}.parquet',
+                        compression='snappy', existing_data_behavior='overwrite_or_ignore')
+
+# Sharded generation: each shard is one CHUNK_SIZE range of customers/meters run
+# through the same pipeline in a worker process and written to its own part
+# files, so the output is the same for any NUM_WORKERS.
+
+def generate_shard(shard, num_customers, topology, output_dir):
+    chunks = iter_customer_chunks(num_customers, topology, shards=[shard])
+    write_chunks(add_billing(add_consumption(add_meters(chunks), topology['network_cities'])), output_dir, part=shard)
+    return shard
+
+def generate_sharded(num_customers, topology, output_dir=OUTPUT_DIR, num_workers=NUM_WORKERS):
+    num_shards = (num_customers + CHUNK_SIZE - 1) // CHUNK_SIZE
+    with ProcessPoolExecutor(num_workers) as executor:
+        futures = [executor.submit(generate_shard, shard, num_customers, topology, output_dir)
+                   for shard in range(num_shards)]
+        for future in futures:
+            future.result()
 
 # Generate customers
 
 # In[9]:
 
 
-# Generate data
-assets = [generate_asset(i, "Power Plant") for i in range(1, NUM_POWER_PLANTS + 1)]
-assets += [generate_asset(i, "Transmission Line") for i in range(NUM_POWER_PLANTS + 1, NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + 1)]
-assets += [generate_asset(i, "Substation") for i in range(NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + 1, NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + NUM_SUBSTATIONS + 1)]
-assets += [generate_asset(i, "Distribution Network") for i in range(NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + NUM_SUBSTATIONS + 1, NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + NUM_SUBSTATIONS + NUM_DISTRIBUTION_NETWORKS + 1)]
-
-power_plants = [generate_power_plant(i) for i in range(1, NUM_POWER_PLANTS + 1)]
-transmission_lines = [generate_transmission_line(i, power_plants) for i in range(NUM_POWER_PLANTS + 1, NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + 1)]
-substations = [generate_substation(i) for i in range(NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + 1, NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + NUM_SUBSTATIONS + 1)]
-distribution_networks = [generate_distribution_network(i, substations) for i in range(NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + NUM_SUBSTATIONS + 1, NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + NUM_SUBSTATIONS + NUM_DISTRIBUTION_NETWORKS + 1)]
-
-
-
-# In[105]:
-
-
-for network in distribution_networks:
-    city = next(sub for sub in substations if sub[0] == network[3])[3]
-
-city, population = random.choices(CITIES, weights=[city[1] for city in CITIES])[0]
-print(city, population)
-
-
-print(city, population)
-
-
-
-# Generate customers with realistic distribution
-customers = []
-# for i in range(1, NUM_CUSTOMERS + 1):
-#     network = random.choices(distribution_networks, weights=[city[1] for city in CITIES[:len(distribution_networks)]])[0]
-#     customers.append(generate_customer(i, [network]))
-
-customers = generate_customers(NUM_CUSTOMERS, distribution_networks)
-
-
-
-import pandas as pd
-cust_df=pd.DataFrame(customers)
-
-
-# In[117]:
-
-
-meters = [generate_meter(i, customer[0]) for i, customer in enumerate(customers, start=1)]
-
-
-# In[209]:
-
-
-len(meters)
-
-
-# In[205]:
-
-
-#meters = [generate_meter(i, customer[0]) for i, customer in enumerate(customers, start=1)]
-
-# Generate consumption and billing data
-consumption_data = []
-billing_data = []
-consumption_id = 1
-bill_id = 1
-
-for meter in meters[:100]:
-    base_consumption = random.uniform(200, 1000)  # kWh per month
-    date = meter[2]  # Installation date
-    #print(date)
-    #print(END_DATE.date())
-    while date <= END_DATE.date():
-        consumption = generate_consumption(consumption_id, meter[0], date, base_consumption / 30)
-        consumption_data.append(consumption)
-        
-        if date.day == 1:  # Generate monthly bills
-            total_consumption = sum(c[3] for c in consumption_data if c[1] == meter[0] and c[2].month == date.month and c[2].year == date.year)
-            billing_data.append(generate_billing(bill_id, meter[3], consumption_id, total_consumption, date))
-            bill_id += 1
-        
-        consumption_id += 1
-        date += timedelta(days=1)
-
-
-
-
-outages = [generate_outage(i, assets) for i in range(1, 1001)]  # Generate 1000 outages
-
-
-# In[201]:
-
-
-# Create DataFrames
-df_assets = pd.DataFrame(assets, columns=['asset_id', 'asset_type'])
-df_power_plants = pd.DataFrame(power_plants, columns=['plant_id', 'plant_name', 'capacity', 'location', 'asset_id'])
-df_transmission_lines = pd.DataFrame(transmission_lines, columns=['line_id', 'line_name', 'voltage', 'length', 'plant_id', 'asset_id'])
-df_substations = pd.DataFrame(substations, columns=['substation_id', 'substation_name', 'capacity', 'location', 'asset_id'])
-df_distribution_networks = pd.DataFrame(distribution_networks, columns=['network_id', 'network_name', 'voltage', 'substation_id', 'asset_id'])
-df_customers = pd.DataFrame(customers, columns=['customer_id', 'customer_name', 'address', 'network_id'])
-df_meters = pd.DataFrame(meters, columns=['meter_id', 'meter_type', 'installation_date', 'customer_id'])
-# df_consumption = pd.DataFrame(consumption_data, columns=['consumption_id', 'meter_id', 'reading_date', 'consumption'])
-# df_billing = pd.DataFrame(billing_data, columns=['bill_id', 'customer_id', 'billing_date', 'amount', 'consumption_id'])
-# df_outages = pd.DataFrame(outages, columns=['outage_id', 'start_time', 'end_time', 'description', 'asset_id'])
-
+if __name__ == "__main__":
+    random.seed(SEED)
 
-# In[211]:
+    # Generate data
+    assets = [generate_asset(i, "Power Plant") for i in range(1, NUM_POWER_PLANTS + 1)]
+    assets += [generate_asset(i, "Transmission Line") for i in range(NUM_POWER_PLANTS + 1, NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + 1)]
+    assets += [generate_asset(i, "Substation") for i in range(NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + 1, NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + NUM_SUBSTATIONS + 1)]
+    assets += [generate_asset(i, "Distribution Network") for i in range(NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + NUM_SUBSTATIONS + 1, NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + NUM_SUBSTATIONS + NUM_DISTRIBUTION_NETWORKS + 1)]
 
+    power_plants = [generate_power_plant(i) for i in range(1, NUM_POWER_PLANTS + 1)]
+    transmission_lines = [generate_transmission_line(i, power_plants) for i in range(NUM_POWER_PLANTS + 1, NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + 1)]
+    substations = [generate_substation(i) for i in range(NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + 1, NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + NUM_SUBSTATIONS + 1)]
+    distribution_networks = [generate_distribution_network(i, substations) for i in range(NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + NUM_SUBSTATIONS + 1, NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + NUM_SUBSTATIONS + NUM_DISTRIBUTION_NETWORKS + 1)]
 
-def save_to_csv(df, filename):
-    df.to_csv(filename, index=False)
+    # Save the dimension tables, then generate customers -> meters -> consumption ->
+    # billing shard by shard across NUM_WORKERS processes
+    write_chunks([{
+        'assets': assets,
+        'power_plants': power_plants,
+        'transmission_lines': transmission_lines,
+        'substations': substations,
+        'distribution_networks': distribution_networks,
+    }])
 
-# Save all DataFrames to CSV files
-save_to_csv(df_assets, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/assets.csv')
-save_to_csv(df_power_plants, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/power_plants.csv')
-save_to_csv(df_transmission_lines, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/transmission_lines.csv')
-save_to_csv(df_substations, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/substations.csv')
-save_to_csv(df_distribution_networks, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/distribution_networks.csv')
-save_to_csv(df_customers, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/customers.csv')
-save_to_csv(df_meters, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/meters.csv')
-save_to_csv(df_consumption, 'consumption.csv')
-save_to_csv(df_billing, 'billing.csv')
-save_to_csv(df_outages, 'outages.csv')
+    generate_sharded(NUM_CUSTOMERS, build_topology_index(substations, distribution_networks))
 
-print("Data generation complete. CSV files have been created.")
+    random.seed(SEED + 1)
+    fake.seed_instance(SEED + 1)
+    outages = [generate_outage(i, assets) for i in range(1, 1001)]  # Generate 1000 outages
+    write_chunks([{'outages': outages}])
 
+    print(f"Data generation complete. {OUTPUT_FORMAT.upper()} files have been created.")
@@ -31,6 +31,7 @@ spark = SparkSession.builder.appName("Energy Consumption")\
     .config("spark.executor.instances", "4")\
     .config("spark.executor.cores", "2")\
     .config("spark.executor.memory", "2g") \
+    .config("spark.sql.sources.partitionOverwriteMode", "dynamic") \
     .getOrCreate()
 
 
@@ -39,11 +40,16 @@ spark = SparkSession.builder.appName("Energy Consumption")\
 
 
 from pyspark.sql import SparkSession
-from pyspark.sql.functions import udf, col, rand, explode, sequence, to_date, datediff, expr, lit, when
+from pyspark.sql.functions import udf, col, rand, explode, sequence, to_date, datediff, expr, lit, when, year, month
+from pyspark.sql.functions import sin, cos, sqrt, log, dayofyear, dayofweek, xxhash64, greatest, coalesce, broadcast
+from pyspark.sql.functions import window, current_timestamp
 from pyspark.sql.types import StructType, StructField, IntegerType, StringType, FloatType, DateType, TimestampType
+from pyspark import StorageLevel
+import json
 import random
 from datetime import datetime, timedelta
 import numpy as np
+import pandas as pd
 from faker import Faker
 
 # Initialize Spark session
@@ -64,6 +70,21 @@ NUM_TRANSMISSION_LINES = 200
 NUM_SUBSTATIONS = 500
 NUM_DISTRIBUTION_NETWORKS = 1000
 NUM_CUSTOMERS = 1000000
+NUM_DAYS = (END_DATE - START_DATE).days + 1
+NUM_MONTHS = (END_DATE.year - START_DATE.year) * 12 + END_DATE.month - START_DATE.month + 1
+METERS_PER_PARTITION = 2000  # meters per consumption partition (rows of as many full meter histories)
+CHUNK_MONTHS = 1  # months of consumption and billing generated and written per job; 3 for quarters
+OUTPUT_DIR = '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps'
+
+# Streaming mode: emit live readings from a rate source instead of the batch consumption dump
+STREAMING_MODE = False
+STREAM_ROWS_PER_SECOND = 10000
+STREAM_WINDOW = "1 minute"  # aggregate window per network/city
+STREAM_WATERMARK = "30 seconds"  # how late a reading may arrive and still be counted
+STREAM_SINK = "memory"  # or "parquet" / "csv" under OUTPUT_DIR/stream
+SEED = 6750
+OUTPUT_FORMAT = "csv"  # or "parquet"
+MATERIALIZE_DIR = None  # local Parquet copies of the dimensions; None persists them in memory+disk
 
 # Lists of major US cities and their approximate populations
 CITIES = [
@@ -86,16 +107,150 @@ CITIES = [
     ("New Orleans", 383997), ("Wichita", 389255)
 ]
 
-# Events that might affect energy consumption
+# State of each city in CITIES
+CITY_STATES = {
+    "New York City": "NY", "Los Angeles": "CA", "Chicago": "IL", "Houston": "TX",
+    "Phoenix": "AZ", "Philadelphia": "PA", "San Antonio": "TX", "San Diego": "CA",
+    "Dallas": "TX", "San Jose": "CA", "Austin": "TX", "Jacksonville": "FL",
+    "Fort Worth": "TX", "Columbus": "OH", "San Francisco": "CA", "Charlotte": "NC",
+    "Indianapolis": "IN", "Seattle": "WA", "Denver": "CO", "Washington": "DC",
+    "Boston": "MA", "El Paso": "TX", "Detroit": "MI", "Nashville": "TN",
+    "Portland": "OR", "Memphis": "TN", "Oklahoma City": "OK", "Las Vegas": "NV",
+    "Louisville": "KY", "Baltimore": "MD", "Milwaukee": "WI", "Albuquerque": "NM",
+    "Tucson": "AZ", "Fresno": "CA", "Sacramento": "CA", "Mesa": "AZ",
+    "Kansas City": "MO", "Atlanta": "GA", "Long Beach": "CA", "Omaha": "NE",
+    "Raleigh": "NC", "Colorado Springs": "CO", "Miami": "FL", "Virginia Beach": "VA",
+    "Oakland": "CA", "Minneapolis": "MN", "Tulsa": "OK", "Arlington": "TX",
+    "New Orleans": "LA", "Wichita": "KS"
+}
+
+# Events that might affect energy consumption: (start, end, name, effect, region)
+# where region is None for national events, a state code or a city name
 EVENTS = [
-    ("2020-03-15", "2020-06-30", "COVID-19 Lockdowns", -0.2),
-    ("2021-02-13", "2021-02-17", "Texas Winter Storm", 0.5),
-    ("2021-06-15", "2021-09-15", "Summer Heatwave", 0.3),
-    ("2022-06-01", "2022-08-31", "Energy Price Spike", -0.1),
-    ("2023-01-01", "2023-12-31", "Economic Recession", -0.15),
-    ("2024-06-01", "2024-08-31", "Olympic Games", 0.2)
+    ("2020-03-15", "2020-06-30", "COVID-19 Lockdowns", -0.2, None),
+    ("2021-02-13", "2021-02-17", "Texas Winter Storm", 0.5, "TX"),
+    ("2021-06-15", "2021-09-15", "Summer Heatwave", 0.3, None),
+    ("2022-06-01", "2022-08-31", "Energy Price Spike", -0.1, None),
+    ("2023-01-01", "2023-12-31", "Economic Recession", -0.15, None),
+    ("2024-06-01", "2024-08-31", "Olympic Games", 0.2, None)
 ]
 
+def compile_event_calendar(events):
+    # Compile EVENTS once into per-day multiplier lists indexed by days since
+    # START_DATE: one national list (key None) plus one per city that has
+    # regional events. Uses difference arrays, so overlapping events are cheap.
+    num_days = (END_DATE - START_DATE).days + 1
+    national = np.zeros(num_days + 1)
+    regional = {}
+    for event_start, event_end, _, effect, region in events:
+        first = max((datetime.strptime(event_start, "%Y-%m-%d") - START_DATE).days, 0)
+        last = min((datetime.strptime(event_end, "%Y-%m-%d") - START_DATE).days, num_days - 1)
+        if first > last:
+            continue
+        if region is None:
+            targets = [national]
+        else:
+            cities = [region] if region in CITY_STATES else [city for city, state in CITY_STATES.items() if state == region]
+            targets = [regional.setdefault(city, np.zeros(num_days + 1)) for city in cities]
+        for diff in targets:
+            diff[first] += effect
+            diff[last + 1] -= effect
+    national = np.cumsum(national)[:num_days]
+    calendar = {None: (1 + national).tolist()}
+    for city, diff in regional.items():
+        calendar[city] = (1 + national + np.cumsum(diff)[:num_days]).tolist()
+    return calendar
+
+EVENT_CALENDAR = compile_event_calendar(EVENTS)
+
+# Batch generators for mapInPandas: each takes an iterator of pandas batches of
+# spark.range ids and yields whole column batches, so Python work is paid per
+# Arrow batch instead of per row
+
+def seeded_batches(batches):
+    # Pairs each batch with a numpy Generator and a Faker seeded from the first
+    # id of its partition, so every partition draws its own reproducible stream
+    rng = batch_fake = None
+    for batch in batches:
+        if batch.empty:
+            continue
+        if rng is None:
+            seed = np.random.SeedSequence([SEED, int(batch["id"].iloc[0])])
+            rng = np.random.default_rng(seed)
+            batch_fake = Faker()
+            batch_fake.seed_instance(int(seed.generate_state(1)[0]))
+        yield batch, rng, batch_fake
+
+POWER_PLANT_SCHEMA = StructType([
+    StructField("plant_id", IntegerType(), True),
+    StructField("plant_name", StringType(), True),
+    StructField("capacity", FloatType(), True),
+    StructField("city", StringType(), True),
+    StructField("asset_id", IntegerType(), True)
+])
+
+def generate_power_plants(batches):
+    plant_types = np.array(["Coal", "Natural Gas", "Nuclear", "Hydroelectric", "Solar", "Wind"], dtype=object)
+    city_names = np.array([city for city, _ in CITIES], dtype=object)
+    for batch, rng, _ in seeded_batches(batches):
+        n = len(batch)
+        ids = batch["id"].astype("int32")
+        plant_type = rng.choice(plant_types, n)
+        city = rng.choice(city_names, n)
+        yield pd.DataFrame({
+            "plant_id": ids,
+            "plant_name": city + " " + plant_type + " Plant",
+            "capacity": rng.uniform(100, 2000, n).astype("float32"),  # MW
+            "city": city,
+            "asset_id": ids,
+        })
+
+METER_SCHEMA = StructType([
+    StructField("meter_id", IntegerType(), True),
+    StructField("meter_type", StringType(), True),
+    StructField("installation_date", DateType(), True),
+    StructField("customer_id", IntegerType(), True)
+])
+
+def generate_meters(batches):
+    # One meter per customer, sharing the customer's id
+    meter_types = np.array(["Smart", "Analog", "Digital"], dtype=object)
+    num_days = (END_DATE - START_DATE).days + 1
+    for batch, rng, _ in seeded_batches(batches):
+        n = len(batch)
+        ids = batch["id"].astype("int32")
+        installation_dates = np.datetime64(START_DATE.date()) + rng.integers(0, num_days, n).astype("timedelta64[D]")
+        yield pd.DataFrame({
+            "meter_id": ids,
+            "meter_type": rng.choice(meter_types, n),
+            "installation_date": installation_dates.astype(object),
+            "customer_id": ids,
+        })
+
+OUTAGE_SCHEMA = StructType([
+    StructField("outage_id", IntegerType(), True),
+    StructField("start_time", TimestampType(), True),
+    StructField("end_time", TimestampType(), True),
+    StructField("description", StringType(), True),
+    StructField("asset_id", IntegerType(), True)
+])
+
+def generate_outages(batches):
+    asset_ids, descriptions = asset_index.value
+    num_seconds = int((END_DATE - START_DATE).total_seconds())
+    for batch, rng, _ in seeded_batches(batches):
+        n = len(batch)
+        picks = rng.integers(0, len(asset_ids), n)
+        start_times = np.datetime64(START_DATE) + rng.integers(0, num_seconds + 1, n).astype("timedelta64[s]")
+        end_times = start_times + rng.integers(1, 25, n).astype("timedelta64[h]")
+        yield pd.DataFrame({
+            "outage_id": batch["id"].astype("int32"),
+            "start_time": start_times,
+            "end_time": end_times,
+            "description": descriptions[picks],
+            "asset_id": asset_ids[picks],
+        })
+
 # UDFs
 @udf(returnType=StructType([
     StructField("asset_id", IntegerType(), True),
@@ -104,157 +259,188 @@ EVENTS = [
 def generate_asset(asset_id, asset_type):
     return (asset_id, asset_type)
 
-@udf(returnType=StructType([
-    StructField("plant_id", IntegerType(), True),
-    StructField("plant_name", StringType(), True),
-    StructField("capacity", FloatType(), True),
-    StructField("city", StringType(), True),
-    StructField("asset_id", IntegerType(), True)
-]))
-def generate_power_plant(plant_id):
-    plant_types = ["Coal", "Natural Gas", "Nuclear", "Hydroelectric", "Solar", "Wind"]
-    plant_type = random.choice(plant_types)
-    capacity = random.uniform(100, 2000)  # MW
-    city, _ = random.choice(CITIES)
-    return (plant_id, f"{city} {plant_type} Plant", capacity, city, plant_id)
-
-@udf(returnType=StructType([
+TRANSMISSION_LINE_SCHEMA = StructType([
     StructField("line_id", IntegerType(), True),
     StructField("line_name", StringType(), True),
     StructField("voltage", IntegerType(), True),
     StructField("length", FloatType(), True),
     StructField("plant_id", IntegerType(), True),
     StructField("asset_id", IntegerType(), True)
-]))
-# def generate_transmission_line(line_id, power_plants):
-#     voltages = [110, 220, 345, 500, 765]  # kV
-#     plant = random.choice(power_plants)
-#     return (line_id, f"Line {line_id}", random.choice(voltages), random.uniform(50, 500), plant[0], line_id)
-
-def generate_transmission_line(line_id):
-    voltages = [110, 220, 345, 500, 765]  # kV
-    plant = random.choice(power_plants)
-    return (line_id, f"Line {line_id}", random.choice(voltages), random.uniform(50, 500),10, line_id)
+])
 
-@udf(returnType=StructType([
+def generate_transmission_lines(batches):
+    voltages = np.array([110, 220, 345, 500, 765], dtype="int32")  # kV
+    plant_ids = np.array(power_plant_ids.value, dtype="int32")
+    for batch, rng, _ in seeded_batches(batches):
+        n = len(batch)
+        ids = batch["id"].astype("int32")
+        yield pd.DataFrame({
+            "line_id": ids,
+            "line_name": "Line " + ids.astype(str),
+            "voltage": rng.choice(voltages, n),
+            "length": rng.uniform(50, 500, n).astype("float32"),  # km
+            "plant_id": rng.choice(plant_ids, n),
+            "asset_id": ids,
+        })
+
+SUBSTATION_SCHEMA = StructType([
     StructField("substation_id", IntegerType(), True),
     StructField("substation_name", StringType(), True),
     StructField("capacity", FloatType(), True),
     StructField("city", StringType(), True),
     StructField("asset_id", IntegerType(), True)
-]))
-def generate_substation(substation_id):
-    city, _ = random.choice(CITIES)
-    return (substation_id, f"{city} Substation {substation_id}", random.uniform(100, 1000), city, substation_id)
+])
 
-@udf(returnType=StructType([
+def generate_substations(batches):
+    city_names = np.array([city for city, _ in CITIES], dtype=object)
+    for batch, rng, _ in seeded_batches(batches):
+        n = len(batch)
+        ids = batch["id"].astype("int32")
+        city = rng.choice(city_names, n)
+        yield pd.DataFrame({
+            "substation_id": ids,
+            "substation_name": city + " Substation " + ids.astype(str),
+            "capacity": rng.uniform(100, 1000, n).astype("float32"),  # MVA
+            "city": city,
+            "asset_id": ids,
+        })
+
+DISTRIBUTION_NETWORK_SCHEMA = StructType([
     StructField("network_id", IntegerType(), True),
     StructField("network_name", StringType(), True),
     StructField("voltage", FloatType(), True),
     StructField("substation_id", IntegerType(), True),
     StructField("asset_id", IntegerType(), True)
-]))
-
-
-# def generate_distribution_network(network_id, substations):
-#     substation = random.choice(substations)
-#     return (network_id, f"Network {network_id}", 11.0, substation[0], network_id)
-
-def generate_distribution_network(network_id):
-    substation = random.choice(substations)
-    return (network_id, f"Network {network_id}", 11.0, substation[0], network_id)
-
-@udf(returnType=StructType([
-    StructField("customer_id", IntegerType(), True),
-    StructField("customer_name", StringType(), True),
-    StructField("address", StringType(), True),
-    StructField("network_id", IntegerType(), True)
-]))
-
-
-def generate_customer(customer_id):
-    network = random.choice(networks)
-    city = next(sub for sub in substations if sub[0] == network[3])[3]
-    #print(city)
-    addr= random.choice(adrs.filter(adrs.city==city).select([lit(fake.street_address()).alias('street'),'zip','lat','lng','state_name',lit('US').alias('country')]).collect())                    
-    #print(addr)
-    return(customer_id, fake.name(),f"{addr[0]} ,[{addr[2]},{addr[3]}],{addr[4]},{addr[1]}, {addr[5]}",network[0])
-
-
+])
 
-@udf(returnType=StructType([
-    StructField("meter_id", IntegerType(), True),
-    StructField("meter_type", StringType(), True),
-    StructField("installation_date", DateType(), True),
-    StructField("customer_id", IntegerType(), True)
-]))
-def generate_meter(meter_id, customer_id):
-    meter_types = ["Smart", "Analog", "Digital"]
-    return (meter_id, random.choice(meter_types), fake.date_between(start_date=START_DATE, end_date=END_DATE), customer_id)
+def generate_distribution_networks(batches):
+    substation_id_values = np.array(substation_ids.value, dtype="int32")
+    for batch, rng, _ in seeded_batches(batches):
+        n = len(batch)
+        ids = batch["id"].astype("int32")
+        yield pd.DataFrame({
+            "network_id": ids,
+            "network_name": "Network " + ids.astype(str),
+            "voltage": np.full(n, 11.0, dtype="float32"),  # kV
+            "substation_id": rng.choice(substation_id_values, n),
+            "asset_id": ids,
+        })
+
+# Random streams, so each draw for a (meter, date) is independent of the others
+STREAM_TEMPERATURE = 1
+STREAM_DAILY = 3
+STREAM_BASE = 4
+STREAM_RATE = 5
+# A normal's second (phase) uniform is drawn on stream | PHASE_STREAM_BIT,
+# which no plain stream (all below 0x80) can collide with
+PHASE_STREAM_BIT = 0x80
+
+def hash_uniform(stream, *cols):
+    # Uniform (0, 1) draw keyed on (SEED, stream, cols): a row always gets the
+    # same value, however the data is partitioned or re-run
+    bits = xxhash64(lit(SEED), lit(stream), *cols).bitwiseAND(lit((1 << 53) - 1))
+    return (bits + 0.5) / float(1 << 53)
+
+def hash_normal(stream, *cols):
+    # Standard normal draw from two hash_uniform streams (Box-Muller)
+    return sqrt(-2 * log(hash_uniform(stream, *cols))) * \
+        cos(2 * np.pi * hash_uniform(stream | PHASE_STREAM_BIT, *cols))
+
+def with_event_effect(readings):
+    # Event multiplier per reading, looked up in EVENT_CALENDAR joined as small
+    # broadcast tables on the day index (and on the city when readings have one)
+    readings = readings.withColumn("day_index", datediff("date", lit(START_DATE.date())))
+    national = spark.createDataFrame([(i, value) for i, value in enumerate(EVENT_CALENDAR[None]) if value != 1],
+                                     "day_index int, national_effect double")
+    readings = readings.join(broadcast(national), "day_index", "left")
+    effect = coalesce(col("national_effect"), lit(1.0))
+    if "city" in readings.columns:
+        regional = spark.createDataFrame([(i, city, value) for city, values in EVENT_CALENDAR.items() if city is not None
+                                          for i, value in enumerate(values)],
+                                         "day_index int, city string, regional_effect double")
+        readings = readings.join(broadcast(regional), ["day_index", "city"], "left")
+        effect = coalesce(col("regional_effect"), effect)
+    return readings.withColumn("effect", effect).drop("day_index", "national_effect", "regional_effect")
+
+def consumption_readings(first_meter=1, num_meters=NUM_CUSTOMERS, first_day=0, num_days=NUM_DAYS,
+                         meter_cities=None):
+    # One row per meter and day (of the num_days from day index first_day) as
+    # arithmetic over a single spark.range, with
+    # consumption_id = meter_offset * NUM_DAYS + day_index + 1. Ids are stable
+    # across runs and chunkings, and range partitions are contiguous runs of
+    # meters, so there is no crossJoin and no shuffle. meter_cities (meter_id,
+    # city) is broadcast-joined in so regional events apply to each meter.
+    # Ceiling division without the builtin max, which the notebook's later
+    # `from pyspark.sql.functions import *` replaces with Spark's max
+    num_partitions = -(-num_meters * num_days // (METERS_PER_PARTITION * NUM_DAYS)) or 1
+    meter_offset = expr(f"id div {num_days}") + (first_meter - 1)
+    day_index = expr(f"id % {num_days}") + first_day
+    readings = spark.range(0, num_meters * num_days, 1, num_partitions).select(
+        (meter_offset * NUM_DAYS + day_index + 1).alias("consumption_id"),
+        (meter_offset + 1).cast("int").alias("meter_id"),
+        expr(f"date_add(to_date('{START_DATE.date()}'), cast(id % {num_days} + {first_day} as int))").alias("date"),
+    ).withColumn("base_consumption", (hash_uniform(STREAM_BASE, "meter_id") * 800 + 200) / 30)
+    if meter_cities is not None:
+        readings = readings.join(broadcast(meter_cities.select("meter_id", "city")), "meter_id", "left")
+    return readings
+
+def generate_consumption(readings):
+    # readings has consumption_id, meter_id, date and base_consumption columns
+    # (and optionally city). Same model as the Python generator, written as
+    # built-in column expressions so it runs in the JVM with no Python worker.
+    day_of_year = dayofyear("date")
 
-@udf(returnType=StructType([
-    StructField("consumption_id", IntegerType(), True),
-    StructField("meter_id", IntegerType(), True),
-    StructField("date", DateType(), True),
-    StructField("consumption", FloatType(), True)
-]))
-def generate_consumption(consumption_id, meter_id, date, base_consumption):
-    # Strong seasonal variation
-    month = date.month
-    day_of_year = date.timetuple().tm_yday
-    # print(month)
-    # print(day_of_year)
-    
     # Summer peak (July) and winter peak (January) with smoother transitions
-    seasonal_factor = 1 + 0.5 * (np.sin((day_of_year - 15) * 2 * np.pi / 365) + 
-                                 0.5 * np.sin((day_of_year - 15) * 4 * np.pi / 365))
-    
+    seasonal_factor = 1 + 0.5 * (sin((day_of_year - 15) * 2 * np.pi / 365) +
+                                 0.5 * sin((day_of_year - 15) * 4 * np.pi / 365))
+
     # Temperature variation (approximate, you may want to use actual temperature data for more accuracy)
-    temp_variation = random.gauss(0, 0.1)  # Random normal distribution
+    temp_variation = 0.1 * hash_normal(STREAM_TEMPERATURE, "meter_id", "date")
     seasonal_factor += temp_variation
-    
-    # Weekly pattern (higher consumption on weekdays)
-    weekday_factor = 1.1 if date.weekday() < 5 else 0.9
-    
-    # Apply random daily variation
-    daily_variation = random.uniform(0.9, 1.1)
-    
-    # Apply event effects
-    event_effect = 1
-    for event_start, event_end, _, effect in EVENTS:
-        if datetime.strptime(event_start, "%Y-%m-%d").date() <= date <= datetime.strptime(event_end, "%Y-%m-%d").date():
-            event_effect += effect
-
-    
-    # Calculate final consumption
-    consumption = base_consumption * seasonal_factor * weekday_factor * daily_variation * event_effect
-    return (consumption_id, meter_id, date, max(0, consumption))
-
-@udf(returnType=StructType([
-    StructField("bill_id", IntegerType(), True),
-    StructField("customer_id", IntegerType(), True),
-    StructField("date", DateType(), True),
-    StructField("amount", FloatType(), True),
-    StructField("consumption_id", IntegerType(), True)
-]))
-def generate_billing(bill_id, customer_id, consumption_id, consumption, date):
-    rate = random.uniform(0.1, 0.2)  # $/kWh
-    amount = consumption * rate
-    return (bill_id, customer_id, date, amount, consumption_id)
 
-@udf(returnType=StructType([
-    StructField("outage_id", IntegerType(), True),
-    StructField("start_time", TimestampType(), True),
-    StructField("end_time", TimestampType(), True),
-    StructField("description", StringType(), True),
-    StructField("asset_id", IntegerType(), True)
-]))
-def generate_outage(outage_id):
-    asset = random.choice(assets)
-    start_time = fake.date_time_between(start_date=START_DATE, end_date=END_DATE)
-    end_time = start_time + timedelta(hours=random.randint(1, 24))
-    return (outage_id, start_time, end_time, f"Outage on {asset[1]}", asset[0])
+    # Weekly pattern (higher consumption on weekdays); dayofweek is 1 = Sunday .. 7 = Saturday
+    weekday_factor = when(dayofweek("date").between(2, 6), 1.1).otherwise(0.9)
 
+    # Apply random daily variation
+    daily_variation = 0.9 + 0.2 * hash_uniform(STREAM_DAILY, "meter_id", "date")
+
+    # Calculate final consumption, with event effects from the calendar
+    consumption = col("base_consumption") * seasonal_factor * weekday_factor * daily_variation * col("effect")
+    extra = [c for c in readings.columns if c not in ("consumption_id", "meter_id", "date", "base_consumption")]
+    return with_event_effect(readings) \
+        .withColumn("consumption", greatest(consumption, lit(0.0)).cast(FloatType())) \
+        .select("consumption_id", "meter_id", "date", "consumption", *extra)
+
+def generate_billing(consumption):
+    # One bill per meter and month from a single groupBy over consumption,
+    # dated on the month's last reading and pointing at its consumption_id.
+    # bill_id = (meter - 1) * NUM_MONTHS + month_index + 1, and the meter id
+    # is also the customer id.
+    month_index = (col("year") - START_DATE.year) * 12 + col("month") - START_DATE.month
+    rate = 0.1 + 0.1 * hash_uniform(STREAM_RATE, "meter_id", "year", "month")  # $/kWh
+    return consumption \
+        .groupBy("meter_id", year("date").alias("year"), month("date").alias("month")) \
+        .agg(expr("sum(consumption)").alias("total_consumption"),
+             expr("max(consumption_id)").alias("consumption_id"),
+             expr("max(date)").alias("date")) \
+        .select(((col("meter_id") - 1) * NUM_MONTHS + month_index + 1).alias("bill_id"),
+                col("meter_id").alias("customer_id"),
+                "date",
+                (col("total_consumption") * rate).cast(FloatType()).alias("amount"),
+                "consumption_id")
+
+def materialize(df, name):
+    # Compute a dimension once. Its generators are random, so every later
+    # action (collect, show, count, save) and every child frame must read this
+    # one copy rather than re-running them. With MATERIALIZE_DIR set the copy
+    # is a Parquet file that survives lost executors; otherwise it is
+    # persisted in memory, spilling to disk.
+    if MATERIALIZE_DIR is not None:
+        df.write.parquet(f"{MATERIALIZE_DIR}/{name}", mode="overwrite")
+        return spark.read.parquet(f"{MATERIALIZE_DIR}/{name}")
+    df = df.persist(StorageLevel.MEMORY_AND_DISK)
+    df.count()
+    return df
 
 # In[7]:
 
@@ -267,34 +453,37 @@ assets_df = spark.range(1, NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + NUM_SUBST
                 .otherwise("Distribution Network")) \
     .withColumn("asset", generate_asset("id", "asset_type")) \
     .select("asset.*")
+assets_df = materialize(assets_df, "assets")
 
 
 # In[9]:
 
 
 power_plants_df = spark.range(1, NUM_POWER_PLANTS + 1) \
-    .withColumn("plant", generate_power_plant("id")) \
-    .select("plant.*")
-power_plants=power_plants_df.collect()
+    .mapInPandas(generate_power_plants, POWER_PLANT_SCHEMA)
+power_plants_df = materialize(power_plants_df, "power_plants")
+# Lookups used by child generators go to executors once as broadcasts, not
+# in every task's closure
+power_plant_ids = spark.sparkContext.broadcast([row[0] for row in power_plants_df.select("plant_id").collect()])
 power_plants_df.createOrReplaceTempView("power_plants_df")
 ## Transmission Lines
 transmission_lines_df = spark.range(NUM_POWER_PLANTS + 1, NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + 1) \
-    .withColumn("line", generate_transmission_line("id")) \
-    .select("line.*")
+    .mapInPandas(generate_transmission_lines, TRANSMISSION_LINE_SCHEMA)
+transmission_lines_df = materialize(transmission_lines_df, "transmission_lines")
 transmission_lines_df.createOrReplaceTempView("transmission_lines_df")
 substations_df = spark.range(NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + 1, NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + NUM_SUBSTATIONS + 1) \
-    .withColumn("substation", generate_substation("id")) \
-    .select("substation.*")
+    .mapInPandas(generate_substations, SUBSTATION_SCHEMA)
+substations_df = materialize(substations_df, "substations")
 substations_df.createOrReplaceTempView("substations_df")
 
 
 # In[11]:
 
 
-substations=substations_df.collect()
+substation_ids = spark.sparkContext.broadcast([row[0] for row in substations_df.select("substation_id").collect()])
 distribution_networks_df = spark.range(NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + NUM_SUBSTATIONS + 1, NUM_POWER_PLANTS + NUM_TRANSMISSION_LINES + NUM_SUBSTATIONS + NUM_DISTRIBUTION_NETWORKS + 1) \
-    .withColumn("network", generate_distribution_network("id")) \
-    .select("network.*")
+    .mapInPandas(generate_distribution_networks, DISTRIBUTION_NETWORK_SCHEMA)
+distribution_networks_df = materialize(distribution_networks_df, "distribution_networks")
 distribution_networks_df.createOrReplaceTempView("distribution_networks_df")
 #distribution_networks_df.show()
 
@@ -307,42 +496,65 @@ select d.network_id , s.city from
 distribution_networks_df d 
 inner join substations_df s
 on s.substation_id=d.substation_id
+order by d.network_id
 """
-network_city = spark.sql(nsql).collect()
+network_city_df = spark.sql(nsql)
+network_city = network_city_df.collect()
 
 
 # In[109]:
 
 
-import pandas as pd
-
 # Read the CSV file into a pandas DataFrame
 address = pd.read_csv('/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/uszips.csv')
-@udf(returnType=StructType([
+
+def build_zip_index(address, cities):
+    # city -> array of "city,zip,[lat,lng],state,US" address tails, kept only
+    # for the given cities so the index stays small enough to broadcast
+    zips = address.loc[address['city'].isin(cities), ['city', 'zip', 'lat', 'lng', 'state_name']]
+    return {city: np.array([f"{c},{z},[{lat},{lng}],{state},US" for c, z, lat, lng, state in rows.values], dtype=object)
+            for city, rows in zips.groupby('city')}
+
+# Ship the lookups to every executor once instead of in each task's closure
+network_index = spark.sparkContext.broadcast((
+    np.array([network[0] for network in network_city], dtype="int32"),
+    np.array([network[1] for network in network_city], dtype=object),
+))
+zip_index = spark.sparkContext.broadcast(build_zip_index(address, {network[1] for network in network_city}))
+
+CUSTOMER_SCHEMA = StructType([
     StructField("customer_id", IntegerType(), True),
     StructField("customer_name", StringType(), True),
     StructField("address", StringType(), True),
     StructField("network_id", IntegerType(), True)
-]))
-def generate_customer(customer_id):
-    network = random.choice(network_city)
-    #print(addr)
-    # Filter the DataFrame based on a column value
-    filtered_df = address[address['city'] == network[1]]
-    addr=random.choice(filtered_df[['city','zip','lat','lng','state_name']].values.tolist())
-    addr_col=f"{fake.street_address()} ,{addr[0]},{addr[1]},[{addr[2]},{addr[3]}],{addr[4]},US"
-    # Print the filtered DataFrame
-    addr_col
-    return (customer_id, fake.name(),addr_col,network[0])
+])
+
+def generate_customers(batches):
+    network_ids, network_cities = network_index.value
+    zips = zip_index.value
+    for batch, rng, batch_fake in seeded_batches(batches):
+        n = len(batch)
+        picks = rng.integers(0, len(network_ids), n)
+        cities = network_cities[picks]
+        addresses = np.empty(n, dtype=object)
+        for city in np.unique(cities):
+            rows = np.flatnonzero(cities == city)
+            tails = zips[city][rng.integers(0, len(zips[city]), len(rows))]
+            addresses[rows] = [f"{batch_fake.street_address()} ,{tail}" for tail in tails]
+        yield pd.DataFrame({
+            "customer_id": batch["id"].astype("int32"),
+            "customer_name": [batch_fake.name() for _ in range(n)],
+            "address": addresses,
+            "network_id": network_ids[picks],
+        })
 
 
 # In[111]:
 
 
-networks=distribution_networks_df.collect()
 customers_df = spark.range(1, NUM_CUSTOMERS + 1) \
-    .withColumn("customer", generate_customer("id")) \
-    .select("customer.*")
+    .mapInPandas(generate_customers, CUSTOMER_SCHEMA)
+customers_df = materialize(customers_df, "customers")
 customers_df.show(truncate=False)
 
 
@@ -370,8 +582,8 @@ customers_df.count()
 
 
 meters_df = spark.range(1, NUM_CUSTOMERS + 1) \
-    .withColumn("meter", generate_meter("id", "id")) \
-    .select("meter.*")
+    .mapInPandas(generate_meters, METER_SCHEMA)
+meters_df = materialize(meters_df, "meters")
 
 
 # In[ ]:
@@ -380,231 +592,228 @@ meters_df = spark.range(1, NUM_CUSTOMERS + 1) \
 meters_df.count()
 
 
-# In[ ]:
-
-
-@udf(returnType=StructType([
-    StructField("consumption_id", IntegerType(), True),
-    StructField("meter_id", IntegerType(), True),
-    StructField("date", DateType(), True),
-    StructField("consumption", FloatType(), True)
-]))
-def generate_consumption(consumption_id, meter_id, date, base_consumption):
-    # Strong seasonal variation
-    month = date.month
-    day_of_year = date.timetuple().tm_yday
-    # print(month)
-    # print(day_of_year)
-    
-    # Summer peak (July) and winter peak (January) with smoother transitions
-    seasonal_factor = 1 + 0.5 * (np.sin((day_of_year - 15) * 2 * np.pi / 365) + 
-                                 0.5 * np.sin((day_of_year - 15) * 4 * np.pi / 365))
-    
-    # Temperature variation (approximate, you may want to use actual temperature data for more accuracy)
-    temp_variation = random.gauss(0, 0.1)  # Random normal distribution
-    seasonal_factor += temp_variation
-    
-    # Weekly pattern (higher consumption on weekdays)
-    weekday_factor = 1.1 if date.weekday() < 5 else 0.9
-    
-    # Apply random daily variation
-    daily_variation = random.uniform(0.9, 1.1)
-    
-    # Apply event effects
-    event_effect = 1
-    for event_start, event_end, _, effect in EVENTS:
-        if datetime.strptime(event_start, "%Y-%m-%d").date() <= date <= datetime.strptime(event_end, "%Y-%m-%d").date():
-            event_effect += effect
-
-    
-    # Calculate final consumption
-    consumption = base_consumption * seasonal_factor * weekday_factor * daily_variation * event_effect
-    return (consumption_id, meter_id, date, max(0, consumption))
-
-
-# In[31]:
-
-
-import decimal
-def generate_consumption(consumption_id, meter_id, date, base_consumption):
-    # Strong seasonal variation
-    #date=datetime.strptime(date1, '%Y-%m-%d')
-    month = date.month
-    day_of_year = date.timetuple().tm_yday
-    # print(month)
-    # print(day_of_year)
-    
-    # Summer peak (July) and winter peak (January) with smoother transitions
-    seasonal_factor = 1 + 0.5 * (np.sin((day_of_year - 15) * 2 * np.pi / 365) + 
-                                 0.5 * np.sin((day_of_year - 15) * 4 * np.pi / 365))
-    
-    # Temperature variation (approximate, you may want to use actual temperature data for more accuracy)
-    temp_variation = random.gauss(0, 0.1)  # Random normal distribution
-    seasonal_factor += temp_variation
-    
-    # Weekly pattern (higher consumption on weekdays)
-    weekday_factor = 1.1 if date.weekday() < 5 else 0.9
-    
-    # Apply random daily variation
-    daily_variation = random.uniform(0.9, 1.1)
-    
-    # Apply event effects
-    event_effect = 1
-    for event_start, event_end, _, effect in EVENTS:
-        # if datetime.strptime(event_start, "%Y-%m-%d").date() <= date <= datetime.strptime(event_end, "%Y-%m-%d").date():
-        #     event_effect += effect
-        if datetime.strptime(event_start, "%Y-%m-%d").date() <= date <= datetime.strptime(event_end, "%Y-%m-%d").date():
-            event_effect += effect
-
-    
-    # Calculate final consumption
-    consumption = base_consumption * seasonal_factor * weekday_factor * daily_variation * event_effect
-    return (consumption_id, meter_id, date, decimal.Decimal(round(max(0, consumption),2)))
-
-
-# In[ ]:
-
-
-generate_consumption(1,1,'2020-01-01',200)
-
-
-# In[ ]:
-
-
-# Generate consumption and billing data
-date_range = spark.sql(f"SELECT explode(sequence(to_date('{START_DATE}'), to_date('{END_DATE}'), interval 1 day)) as date")
-from pyspark.sql.functions import monotonically_increasing_id
-
-consumption_df = meters_df.crossJoin(date_range) \
-    .withColumn("base_consumption", rand() * 800 + 200) \
-    .withColumn("id",monotonically_increasing_id())\
-    .withColumn("consumption", generate_consumption(
-        "id",
-        "meter_id",
-        "date",
-        col("base_consumption")/30
-    )) \
-    .select("consumption.*")
-
-
-
-# In[35]:
-
-
-date_range = spark.sql(f"SELECT explode(sequence(to_date('{START_DATE}'), to_date('{END_DATE}'), interval 1 day)) as date")
-from pyspark.sql.functions import monotonically_increasing_id
-consumption_df = meters_df.crossJoin(date_range) \
-    .withColumn("base_consumption", rand() * 800 + 200) \
-    .withColumn("id",monotonically_increasing_id())\
-    .withColumn("con_inp",col("base_consumption")/30)
-consumption_df.show()
-
-
-# In[39]:
-
-
-from pyspark.sql.types import StructType, StructField, StringType, IntegerType,FloatType,DecimalType
-
-schema = StructType([
-    StructField("consumption_id", IntegerType(), True),
-    StructField("meter_id", IntegerType(), True),
-    StructField("consumption_date", DateType(), True),
-    StructField("consumption", DecimalType(), True)
-])
-_rdd=consumption_df.limit(1000000).rdd
-abc=_rdd.map(lambda row: generate_consumption(row[6],row[0],row[4],row[7]))
-consumption_df_1=spark.createDataFrame(abc,schema)
-consumption_df_1.count()
-
-
-# In[45]:
-
-
-consumption_df_1.printSchema()
-
-
-# In[49]:
-
-
-billing_df = consumption_df_1 \
-    .where(expr("day(consumption_date) = 1")) \
-    .groupBy("meter_id", "consumption_date") \
-    .agg({"consumption": "sum"}) \
-    .withColumnRenamed("sum(consumption)", "total_consumption") \
-    .withColumn("billing", generate_billing(
-        monotonically_increasing_id(),
-        "meter_id",
-        monotonically_increasing_id(),
-        "total_consumption",
-        "consumption_date"
-    )) \
-    .select("billing.*")
-
-
-# In[51]:
-
-
-billing_df.count()
-
-
 # In[55]:
 
 
-assets=assets_df.collect()
+assets = assets_df.collect()
+asset_index = spark.sparkContext.broadcast((
+    np.array([asset[0] for asset in assets], dtype="int32"),
+    np.array([f"Outage on {asset[1]}" for asset in assets], dtype=object),
+))
 outages_df = spark.range(1, 1001) \
-    .withColumn("outage", generate_outage("id")) \
-    .select("outage.*")
+    .mapInPandas(generate_outages, OUTAGE_SCHEMA)
+outages_df = materialize(outages_df, "outages")
+
+# Save DataFrames to CSV or Parquet files
+def date_partitioned(df, date_column=None):
+    # With date_column set, output is partitioned into year=/month= directories
+    # so date-range scans only read the matching files
+    if date_column is None:
+        return df.write
+    return df.withColumn("year", year(date_column)).withColumn("month", month(date_column)) \
+        .write.partitionBy("year", "month")
+
+def save_to_csv(df, filename, date_column=None):
+    date_partitioned(df, date_column).csv(filename, header=True, mode="overwrite")
+
+def save_to_parquet(df, path, date_column=None):
+    # Snappy Parquet keeps the DataFrame's column types
+    date_partitioned(df, date_column).parquet(path, mode="overwrite", compression="snappy")
+
+def save(df, path, date_column=None):
+    if OUTPUT_FORMAT == "parquet":
+        save_to_parquet(df, path, date_column)
+    else:
+        save_to_csv(df, path, date_column)
+
+# Consumption and billing are generated CHUNK_MONTHS at a time. Each chunk
+# overwrites only its own year=/month= partitions (dynamic partition
+# overwrite) and every month it covers is recorded in a manifest, so a rerun
+# (with any CHUNK_MONTHS) skips finished months and a failure only loses the
+# chunk in progress. Every dimension is drawn by seeded_batches, so a rerun
+# regenerates the same customers, networks and meter cities, and a chunk with
+# only some months finished can be regenerated whole, rewriting the finished
+# months with the same rows. The manifest also records run_settings(), and a
+# rerun with different settings is refused rather than mixing two datasets.
+
+def month_chunks(chunk_months=CHUNK_MONTHS):
+    # (months, first_day, num_days) per chunk of whole months: the "YYYY-MM"
+    # labels of the months it covers, and its days as day indexes from START_DATE
+    first = START_DATE
+    while first <= END_DATE:
+        months = first.month - 1 + chunk_months
+        # Compared explicitly, as the builtin min is shadowed by pyspark.sql.functions
+        end = datetime(first.year + months // 12, months % 12 + 1, 1)
+        if end > END_DATE + timedelta(days=1):
+            end = END_DATE + timedelta(days=1)
+        labels = pd.period_range(first, end - timedelta(days=1), freq="M").strftime("%Y-%m").tolist()
+        yield labels, (first - START_DATE).days, (end - first).days
+        first = end
+
+def run_settings():
+    # Settings the generated rows depend on. seeded_batches seeds each
+    # partition from its first id, so the default parallelism (which sets how
+    # spark.range is split) is one of them.
+    return {
+        "seed": SEED,
+        "num_customers": NUM_CUSTOMERS,
+        "num_power_plants": NUM_POWER_PLANTS,
+        "num_transmission_lines": NUM_TRANSMISSION_LINES,
+        "num_substations": NUM_SUBSTATIONS,
+        "num_distribution_networks": NUM_DISTRIBUTION_NETWORKS,
+        "start_date": str(START_DATE.date()),
+        "end_date": str(END_DATE.date()),
+        "output_format": OUTPUT_FORMAT,
+        "default_parallelism": spark.sparkContext.defaultParallelism,
+    }
 
-# Save DataFrames to CSV files
-def save_to_csv(df, filename):
-    df.write.csv(filename, header=True, mode="overwrite")
+def load_manifest(path, settings):
+    # Months finished by an earlier run, which may only be reused if it ran
+    # with the same settings
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get("settings") != settings:
+        raise ValueError(f"{path} was written by a run with settings {manifest.get('settings')}, not {settings}; "
+                         "remove it (and the output it describes) to start over")
+    return set(manifest["completed"])
+
+def save_manifest(path, completed, settings):
+    # Write-then-rename so an interrupted run never leaves a torn manifest
+    with open(path + ".tmp", "w") as f:
+        json.dump({"settings": settings, "completed": sorted(completed)}, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def generate_consumption_chunked(meter_networks, output_dir=OUTPUT_DIR, chunk_months=CHUNK_MONTHS):
+    # meter_networks (meter_id, network_id, city) gives each meter its city for
+    # regional events; the city is not part of the saved consumption
+    manifest_path = f"{output_dir}/manifest.json"
+    os.makedirs(output_dir, exist_ok=True)
+    settings = run_settings()
+    completed = load_manifest(manifest_path, settings)
+    for months, first_day, num_days in month_chunks(chunk_months):
+        if completed.issuperset(months):
+            continue
+        readings = consumption_readings(first_day=first_day, num_days=num_days, meter_cities=meter_networks)
+        consumption = generate_consumption(readings).drop("city").persist(StorageLevel.MEMORY_AND_DISK)
+        save(consumption, f"{output_dir}/consumption", "date")
+        save(generate_billing(consumption), f"{output_dir}/billing", "date")
+        consumption.unpersist()
+        completed.update(months)
+        save_manifest(manifest_path, completed, settings)
+
+# Streaming mode: the same consumption model over a rate source, for
+# load-testing ingestion. Throughput per micro-batch is in each query's
+# lastProgress (inputRowsPerSecond, processedRowsPerSecond); end-to-end
+# latency is emitted_at - last_event_time in the aggregates.
+
+def meter_readings_stream(meter_networks, rows_per_second=STREAM_ROWS_PER_SECOND):
+    # Rate-source row n is a reading of meter n % NUM_CUSTOMERS + 1 at the row's
+    # timestamp. meter_networks (meter_id, network_id, city) adds the meter's
+    # network and city, so regional events apply and aggregates can group on them.
+    # It should be materialized: it is broadcast into every micro-batch, so each
+    # batch only joins locally instead of re-planning and shuffling it.
+    readings = spark.readStream.format("rate").option("rowsPerSecond", rows_per_second).load() \
+        .select((col("value") + 1).alias("consumption_id"),
+                (col("value") % NUM_CUSTOMERS + 1).cast("int").alias("meter_id"),
+                to_date("timestamp").alias("date"),
+                col("timestamp").alias("event_time")) \
+        .withColumn("base_consumption", (hash_uniform(STREAM_BASE, "meter_id") * 800 + 200) / 30) \
+        .join(broadcast(meter_networks), "meter_id")
+    return generate_consumption(readings).withWatermark("event_time", STREAM_WATERMARK)
+
+def network_aggregates(readings):
+    # Per network and city per STREAM_WINDOW, emitted once the watermark closes the window
+    return readings \
+        .groupBy(window("event_time", STREAM_WINDOW), "network_id", "city") \
+        .agg(expr("count(*)").alias("readings"),
+             expr("sum(consumption)").alias("total_consumption"),
+             expr("avg(consumption)").alias("avg_consumption"),
+             expr("max(event_time)").alias("last_event_time")) \
+        .select(col("window.start").alias("window_start"), col("window.end").alias("window_end"),
+                "network_id", "city", "readings", "total_consumption", "avg_consumption", "last_event_time",
+                current_timestamp().alias("emitted_at"))
+
+def start_streaming(meter_networks, sink=STREAM_SINK, output_dir=OUTPUT_DIR):
+    # Raw readings only go to file sinks (a memory sink would keep every one of
+    # them on the driver); the aggregates go to either. Memory sink results are
+    # queryable as the meter_readings / network_aggregates tables.
+    readings = meter_readings_stream(meter_networks)
+    outputs = [("network_aggregates", network_aggregates(readings))]
+    if sink != "memory":
+        outputs.append(("meter_readings", readings.select("consumption_id", "meter_id", "event_time", "consumption",
+                                                          "network_id", "city")))
+    queries = []
+    for name, df in outputs:
+        writer = df.writeStream.outputMode("append").queryName(name).format(sink)
+        if sink != "memory":
+            writer = writer.option("path", f"{output_dir}/stream/{name}") \
+                .option("checkpointLocation", f"{output_dir}/stream/_checkpoints/{name}") \
+                .option("header", True)
+        queries.append(writer.start())
+    return queries
 
 
 # In[59]:
 
 
-save_to_csv(assets_df, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps/assets')
+save(assets_df, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps/assets')
 
 
 # In[61]:
 
 
-save_to_csv(power_plants_df, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps/power_plants')
+save(power_plants_df, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps/power_plants')
 
 
 # In[63]:
 
 
-save_to_csv(transmission_lines_df, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps/transmission_lines')
+save(transmission_lines_df, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps/transmission_lines')
 
 
 # In[65]:
 
 
-save_to_csv(substations_df, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps/substations')
+save(substations_df, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps/substations')
 
 
 # In[67]:
 
 
-save_to_csv(distribution_networks_df, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps/distribution_networks')
+save(distribution_networks_df, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps/distribution_networks')
 
 
 # In[69]:
 
 
-save_to_csv(customers_df, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps/customers')
+save(customers_df, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps/customers')
 
 
 # In[ ]:
 
 
-save_to_csv(meters_df, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps/meters')
-save_to_csv(consumption_df, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps/consumption')
-save_to_csv(billing_df, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps/billing')
-save_to_csv(outages_df, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps/outages')
+save(meters_df, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps/meters')
+
+# Each meter's network and city (meters share their customer's id)
+meter_networks = customers_df.select(col("customer_id").alias("meter_id"), "network_id") \
+    .join(broadcast(network_city_df), "network_id")
+meter_networks = materialize(meter_networks, "meter_networks")
+if not STREAMING_MODE:
+    generate_consumption_chunked(meter_networks)
+save(outages_df, '/Users/subhasishbhaumik/Documents/neu/IE6750/project_data/ps/outages')
+
+print(f"Data generation complete. {OUTPUT_FORMAT.upper()} files have been created.")
+
+
+# In[71]:
+
 
-print("Data generation complete. CSV files have been created.")
+if STREAMING_MODE:
+    # Live readings for the meters of the generated customers
+    queries = start_streaming(meter_networks)
+    spark.streams.awaitAnyTermination()
 
 
 
@@ -0,0 +1,104 @@
+# Database-independent helpers shared by dataload_postgres.py and dataload_mysql.py
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from queue import Queue
+from threading import Event, Thread
+import math
+import random
+
+
+def event_days(start_date, end_date, probability):
+    # Days of a process with an event on each day with the given probability,
+    # drawn by jumping geometric gaps between events rather than one draw per day
+    days = []
+    day = start_date
+    while True:
+        day += timedelta(days=int(math.log(1.0 - random.random()) / math.log(1.0 - probability)))
+        if day > end_date:
+            return days
+        days.append(day)
+        day += timedelta(days=1)
+
+def load_asset_ids(cursor):
+    asset_ids = {}
+    for asset_type, id_column, table in [('plant', 'plant_id', 'Power_Plants'),
+                                         ('line', 'line_id', 'Transmission_Lines'),
+                                         ('substation', 'substation_id', 'Substations'),
+                                         ('network', 'network_id', 'Distribution_Networks')]:
+        cursor.execute(f"SELECT {id_column} FROM {table}")
+        asset_ids[asset_type] = [row[0] for row in cursor.fetchall()]
+    return asset_ids
+
+def choose_assets(asset_ids, n):
+    # Randomly choose an asset type, then an asset of that type, for n events
+    asset_types = random.choices(['plant', 'line', 'substation', 'network'], k=n)
+    return asset_types, [random.choice(asset_ids[asset_type]) for asset_type in asset_types]
+
+def produce_batches(batches, queue, stopped):
+    # Producer side of a pipeline: put each batch on the bounded queue,
+    # blocking while it is full, then None to mark the end. An exception is
+    # handed over to the consumer to raise.
+    try:
+        for batch in batches:
+            if stopped.is_set():
+                return
+            queue.put(batch)
+        queue.put(None)
+    except Exception as e:
+        queue.put(e)
+
+def pipelined(batches, queue_depth):
+    # Iterate over batches generated on a producer thread that runs up to
+    # queue_depth batches ahead, so building the next batches overlaps with
+    # writing the current one instead of alternating with it
+    queue = Queue(maxsize=queue_depth)
+    stopped = Event()
+    Thread(target=produce_batches, args=(batches, queue, stopped), daemon=True).start()
+    try:
+        while True:
+            batch = queue.get()
+            if batch is None:
+                return
+            if isinstance(batch, Exception):
+                raise batch
+            yield batch
+    finally:
+        # If the consumer stops early, let a producer blocked on put() finish
+        stopped.set()
+        while not queue.empty():
+            queue.get_nowait()
+
+def consumption_tasks(load_consumption, start_date, end_date, first_id, chunk_days):
+    # Split the date range into chunk_days-day load tasks for run_load_plan,
+    # each calling load_consumption(conn, chunk_start, chunk_end, first_id, start_date)
+    tasks = {}
+    chunk_start = start_date
+    while chunk_start <= end_date:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end_date)
+        tasks[f"consumption {chunk_start:%Y-%m-%d}"] = (
+            load_consumption, (chunk_start, chunk_end, first_id, start_date), {"meters"})
+        chunk_start = chunk_end + timedelta(days=1)
+    return tasks
+
+def run_load_plan(plan, run_task, num_workers):
+    # plan maps a task name to (function, args, names of the tasks it depends
+    # on). A task starts, as run_task(function, *args) on a worker thread, once
+    # everything it depends on has finished, so parent tables are loaded before
+    # their children, and independent tasks run side by side on up to
+    # num_workers threads.
+    done = set()
+    running = {}
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        while len(done) < len(plan):
+            for name, (function, args, dependencies) in plan.items():
+                if name not in done and name not in running.values() and dependencies <= done:
+                    running[executor.submit(run_task, function, *args)] = name
+            if not running:
+                # Nothing can start: the rest wait on tasks missing from the plan or on each other
+                blocked = sorted(set(plan) - done)
+                raise ValueError(f"tasks {blocked} depend on tasks that are not in the plan or form a cycle")
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                future.result()  # Re-raise the exception of a failed task
+                done.add(running.pop(future))
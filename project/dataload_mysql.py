@@ -1,7 +1,13 @@
 import mysql.connector
+from mysql.connector.pooling import MySQLConnectionPool
 from faker import Faker
+from dataload_common import (choose_assets, consumption_tasks, event_days, load_asset_ids,
+                             pipelined, run_load_plan)
 from datetime import datetime, timedelta
+import csv
+import os
 import random
+import tempfile
 
 fake = Faker()
 
@@ -13,10 +19,89 @@ db_config = {
     'database': 'power_grid_db'
 }
 
-conn = mysql.connector.connect(**db_config)
+# Bulk write settings: 'insert' sends multi-row INSERTs sized to the server's
+# max_allowed_packet; 'load_data' streams each batch through LOAD DATA LOCAL
+# INFILE (needs local_infile=1 on the server). Rows are committed
+# TRANSACTION_ROWS at a time.
+BULK_MODE = 'insert'
+TRANSACTION_ROWS = 100000
+
+# Tables are loaded by NUM_WORKERS threads, each on its own pooled
+# connection (plus one for the main thread); Energy_Consumption is split into
+# tasks of CONSUMPTION_CHUNK_DAYS days each
+NUM_WORKERS = 4
+CONSUMPTION_CHUNK_DAYS = 30
+
+# Number of day batches of readings the generator may run ahead of the writer
+PIPELINE_QUEUE_DEPTH = 4
+
+pool = MySQLConnectionPool(pool_name="dataload", pool_size=NUM_WORKERS + 1,
+                           **db_config, **({'allow_local_infile_in_path': tempfile.gettempdir()}
+                                           if BULK_MODE == 'load_data' else {}))
+
+conn = pool.get_connection()
 cursor = conn.cursor()
+cursor.execute("SELECT @@max_allowed_packet")
+max_packet_bytes = cursor.fetchone()[0]
+conn.close()
+
+# Sizes of the name/street/zip vocabularies customers are sampled from
+IDENTITY_POOL_SIZE = 1000
+STREET_POOL_SIZE = 10000
+ZIPS_PER_CITY = 25
+
+def next_id(cursor, table, id_column):
+    # Ids for rows that children reference are assigned client-side, starting
+    # after the table's current maximum, so they are known without lastrowid
+    cursor.execute(f"SELECT COALESCE(MAX({id_column}), 0) + 1 FROM {table}")
+    return cursor.fetchone()[0]
+
+def insert_rows(cursor, table, columns, rows):
+    # Multi-row INSERT statements, each kept under max_allowed_packet (with
+    # headroom for quoting and escaping)
+    head = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+    placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    budget = int(max_packet_bytes * 0.9) - len(head)
+    batch, size = [], 0
+    for row in rows:
+        row_size = sum(len(str(value)) + 4 for value in row)
+        if batch and size + row_size > budget:
+            cursor.execute(head + ", ".join([placeholder] * len(batch)), [value for row in batch for value in row])
+            batch, size = [], 0
+        batch.append(row)
+        size += row_size
+    if batch:
+        cursor.execute(head + ", ".join([placeholder] * len(batch)), [value for row in batch for value in row])
+
+def load_data_rows(cursor, table, columns, rows):
+    # LOAD DATA LOCAL INFILE from a temporary CSV file. Fields use CSV quoting
+    # with no backslash escapes, and None is written as an unquoted NULL.
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, newline='') as f:
+        csv.writer(f, lineterminator='\n').writerows(['NULL' if value is None else value for value in row] for row in rows)
+    try:
+        cursor.execute(f"""
+            LOAD DATA LOCAL INFILE %s INTO TABLE {table}
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+            LINES TERMINATED BY '\\n'
+            ({', '.join(columns)})
+        """, (f.name,))
+    finally:
+        os.remove(f.name)
 
-def generate_power_plants(num_plants):
+def write_rows(conn, table, columns, rows, commit=True):
+    # Bulk-write rows with BULK_MODE, committing every TRANSACTION_ROWS rows
+    # (or leaving the transaction to the caller when commit is False)
+    cursor = conn.cursor()
+    for start in range(0, len(rows), TRANSACTION_ROWS):
+        batch = rows[start:start + TRANSACTION_ROWS]
+        if BULK_MODE == 'load_data':
+            load_data_rows(cursor, table, columns, batch)
+        else:
+            insert_rows(cursor, table, columns, batch)
+        if commit:
+            conn.commit()
+
+def generate_power_plants(conn, num_plants):
     plants = []
     for _ in range(num_plants):
         plant = (
@@ -26,10 +111,10 @@ def generate_power_plants(num_plants):
         )
         plants.append(plant)
     
-    cursor.executemany("INSERT INTO Power_Plants (plant_name, capacity, location) VALUES (%s, %s, %s)", plants)
-    conn.commit()
+    write_rows(conn, "Power_Plants", ["plant_name", "capacity", "location"], plants)
 
-def generate_transmission_lines(num_lines):
+def generate_transmission_lines(conn, num_lines):
+    cursor = conn.cursor()
     cursor.execute("SELECT plant_id FROM Power_Plants")
     plant_ids = [row[0] for row in cursor.fetchall()]
     
@@ -43,10 +128,9 @@ def generate_transmission_lines(num_lines):
         )
         lines.append(line)
     
-    cursor.executemany("INSERT INTO Transmission_Lines (line_name, voltage, length, plant_id) VALUES (%s, %s, %s, %s)", lines)
-    conn.commit()
+    write_rows(conn, "Transmission_Lines", ["line_name", "voltage", "length", "plant_id"], lines)
 
-def generate_substations(num_substations):
+def generate_substations(conn, num_substations):
     substations = []
     for _ in range(num_substations):
         substation = (
@@ -56,10 +140,10 @@ def generate_substations(num_substations):
         )
         substations.append(substation)
     
-    cursor.executemany("INSERT INTO Substations (substation_name, capacity, location) VALUES (%s, %s, %s)", substations)
-    conn.commit()
+    write_rows(conn, "Substations", ["substation_name", "capacity", "location"], substations)
 
-def link_transmission_substations():
+def link_transmission_substations(conn):
+    cursor = conn.cursor()
     cursor.execute("SELECT line_id FROM Transmission_Lines")
     line_ids = [row[0] for row in cursor.fetchall()]
     
@@ -68,13 +152,14 @@ def link_transmission_substations():
     
     links = []
     for line_id in line_ids:
-        for _ in range(random.randint(1, 3)):  # Each line connects to 1-3 substations
-            links.append((line_id, random.choice(substation_ids)))
+        # Each line connects to 1-3 distinct substations (distinct, as (line_id, substation_id) is the key)
+        for substation_id in random.sample(substation_ids, min(random.randint(1, 3), len(substation_ids))):
+            links.append((line_id, substation_id))
     
-    cursor.executemany("INSERT INTO Transmission_Substation (line_id, substation_id) VALUES (%s, %s)", links)
-    conn.commit()
+    write_rows(conn, "Transmission_Substation", ["line_id", "substation_id"], links)
 
-def generate_distribution_networks(num_networks):
+def generate_distribution_networks(conn, num_networks):
+    cursor = conn.cursor()
     cursor.execute("SELECT substation_id FROM Substations")
     substation_ids = [row[0] for row in cursor.fetchall()]
     
@@ -87,26 +172,49 @@ def generate_distribution_networks(num_networks):
         )
         networks.append(network)
     
-    cursor.executemany("INSERT INTO Distribution_Networks (network_name, voltage, substation_id) VALUES (%s, %s, %s)", networks)
-    conn.commit()
+    write_rows(conn, "Distribution_Networks", ["network_name", "voltage", "substation_id"], networks)
 
-def generate_customers(num_customers):
-    cursor.execute("SELECT network_id FROM Distribution_Networks")
-    network_ids = [row[0] for row in cursor.fetchall()]
+def build_identity_pools(cities):
+    # Draw names, street addresses, and per-city states and zip codes from
+    # Faker once; customers are then assembled from these pools instead of
+    # calling Faker per row
+    return {
+        'first_names': [fake.first_name() for _ in range(IDENTITY_POOL_SIZE)],
+        'last_names': [fake.last_name() for _ in range(IDENTITY_POOL_SIZE)],
+        'streets': [fake.street_address() for _ in range(STREET_POOL_SIZE)],
+        'states': {city: fake.state_abbr() for city in cities},
+        'zip_codes': {city: [fake.zipcode() for _ in range(ZIPS_PER_CITY)] for city in cities},
+    }
+
+def generate_customers(conn, num_customers):
+    cursor = conn.cursor()
+    # Customers live in the city of their network's substation
+    cursor.execute("""
+        SELECT dn.network_id, s.location
+        FROM Distribution_Networks dn
+        JOIN Substations s ON dn.substation_id = s.substation_id
+    """)
+    network_data = cursor.fetchall()
+    pools = build_identity_pools({location for _, location in network_data})
     
-    customers = []
-    for _ in range(num_customers):
-        customer = (
-            fake.name(),
-            fake.address(),
-            random.choice(network_ids)
-        )
-        customers.append(customer)
+    # Sample every column for all customers at once, then zip them into rows
+    chosen_networks = random.choices(network_data, k=num_customers)
+    first_names = random.choices(pools['first_names'], k=num_customers)
+    last_names = random.choices(pools['last_names'], k=num_customers)
+    streets = random.choices(pools['streets'], k=num_customers)
+    zip_picks = random.choices(range(ZIPS_PER_CITY), k=num_customers)
     
-    cursor.executemany("INSERT INTO Customers (customer_name, address, network_id) VALUES (%s, %s, %s)", customers)
-    conn.commit()
+    customers = [(
+        first_name + " " + last_name,
+        street + ", " + location + ", " + pools['states'][location] + " " + pools['zip_codes'][location][zip_pick],
+        network_id
+    ) for (network_id, location), first_name, last_name, street, zip_pick
+        in zip(chosen_networks, first_names, last_names, streets, zip_picks)]
+    
+    write_rows(conn, "Customers", ["customer_name", "address", "network_id"], customers)
 
-def generate_meters(num_meters):
+def generate_meters(conn, num_meters):
+    cursor = conn.cursor()
     cursor.execute("SELECT customer_id FROM Customers")
     customer_ids = [row[0] for row in cursor.fetchall()]
     
@@ -119,165 +227,147 @@ def generate_meters(num_meters):
         )
         meters.append(meter)
     
-    cursor.executemany("INSERT INTO Meters (meter_type, installation_date, customer_id) VALUES (%s, %s, %s)", meters)
-    conn.commit()
+    write_rows(conn, "Meters", ["meter_type", "installation_date", "customer_id"], meters)
 
-def generate_energy_consumption(start_date, end_date):
-    cursor.execute("SELECT meter_id FROM Meters")
+def generate_energy_consumption(conn, start_date, end_date, first_id, first_date):
+    # Readings for start_date..end_date, one of several chunks of a load that
+    # may run side by side. Ids are assigned client-side in (day, meter) order
+    # counted from first_date and first_id, so chunks get disjoint ids and a
+    # later reading always has a larger id, whichever chunk commits first.
+    cursor = conn.cursor()
+    cursor.execute("SELECT meter_id FROM Meters ORDER BY meter_id")
     meter_ids = [row[0] for row in cursor.fetchall()]
     
+    first_chunk_id = first_id + (start_date - first_date).days * len(meter_ids)
+    # Day batches are smaller than a transaction, so commit whenever
+    # TRANSACTION_ROWS rows have been written since the last commit
+    uncommitted = 0
+    batches = consumption_batches(meter_ids, start_date, end_date, first_chunk_id)
+    for consumptions in pipelined(batches, PIPELINE_QUEUE_DEPTH):
+        write_rows(conn, "Energy_Consumption", ["consumption_id", "meter_id", "reading_date", "consumption"],
+                   consumptions, commit=False)
+        uncommitted += len(consumptions)
+        if uncommitted >= TRANSACTION_ROWS:
+            conn.commit()
+            uncommitted = 0
+    conn.commit()
+
+def consumption_batches(meter_ids, start_date, end_date, consumption_id):
+    # One batch of readings per day, numbered from consumption_id
     current_date = start_date
     while current_date <= end_date:
         consumptions = []
         for meter_id in meter_ids:
             consumption = (
+                consumption_id,
                 meter_id,
                 current_date,
                 random.uniform(10, 100)  # consumption in kWh
             )
             consumptions.append(consumption)
+            consumption_id += 1
         
-        cursor.executemany("INSERT INTO Energy_Consumption (meter_id, reading_date, consumption) VALUES (%s, %s, %s)", consumptions)
-        conn.commit()
+        yield consumptions
         current_date += timedelta(days=1)
 
-def generate_billing(start_date, end_date):
-    cursor.execute("SELECT customer_id FROM Customers")
-    customer_ids = [row[0] for row in cursor.fetchall()]
-    
-    current_date = start_date
-    while current_date <= end_date:
-        bills = []
-        for customer_id in customer_ids:
-            # Get the latest consumption for this customer
-            cursor.execute("""
-                SELECT ec.consumption_id, ec.consumption 
-                FROM Energy_Consumption ec
-                JOIN Meters m ON ec.meter_id = m.meter_id
-                WHERE m.customer_id = %s AND ec.reading_date = %s
-            """, (customer_id, current_date))
-            result = cursor.fetchone()
-            if result:
-                consumption_id, consumption = result
-                bill = (
-                    customer_id,
-                    current_date,
-                    consumption * random.uniform(0.10, 0.15),  # amount in currency
-                    consumption_id
-                )
-                bills.append(bill)
-        
-        cursor.executemany("INSERT INTO Billing (customer_id, billing_date, amount, consumption_id) VALUES (%s, %s, %s, %s)", bills)
-        conn.commit()
-        current_date += timedelta(days=30)  # Monthly billing
+def generate_billing(conn, start_date, end_date):
+    cursor = conn.cursor()
+    # One set-based pass: each customer's consumption is summed per 30-day
+    # billing cycle by a single INSERT ... SELECT, so billing costs one scan of
+    # Energy_Consumption instead of a query per customer per cycle. A bill is
+    # dated on its cycle's last reading and references that reading, which is
+    # the cycle's MAX(consumption_id) as ids run in (day, meter) order.
+    cursor.execute("""
+        INSERT INTO Billing (customer_id, billing_date, amount, consumption_id)
+        SELECT m.customer_id,
+               MAX(ec.reading_date),
+               SUM(ec.consumption) * (0.10 + RAND() * 0.05),
+               MAX(ec.consumption_id)
+        FROM Energy_Consumption ec
+        JOIN Meters m ON ec.meter_id = m.meter_id
+        WHERE ec.reading_date BETWEEN %s AND %s
+        GROUP BY m.customer_id, DATEDIFF(ec.reading_date, %s) DIV 30
+    """, (start_date, end_date, start_date))
+    conn.commit()
 
-def generate_maintenance(start_date, end_date):
-    cursor.execute("SELECT plant_id FROM Power_Plants")
-    plant_ids = [row[0] for row in cursor.fetchall()]
+def generate_maintenance(conn, start_date, end_date):
+    cursor = conn.cursor()
+    # All events are drawn up front with client-assigned ids, then the parent
+    # and junction tables are written as two bulk batches in one transaction
+    days = event_days(start_date, end_date, 0.1)  # 10% chance of maintenance on any given day
+    asset_types, asset_ids = choose_assets(load_asset_ids(cursor), len(days))
     
-    cursor.execute("SELECT line_id FROM Transmission_Lines")
-    line_ids = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute("SELECT substation_id FROM Substations")
-    substation_ids = [row[0] for row in cursor.fetchall()]
+    first_id = next_id(cursor, "Maintenance", "maintenance_id")
+    maintenance_ids = range(first_id, first_id + len(days))
+    maintenance = list(zip(maintenance_ids,
+                           days,
+                           [fake.sentence() for _ in days],
+                           [random.uniform(1000, 10000) for _ in days]))  # cost
+    asset_maintenance = list(zip(maintenance_ids, asset_ids, asset_types))
     
-    cursor.execute("SELECT network_id FROM Distribution_Networks")
-    network_ids = [row[0] for row in cursor.fetchall()]
-    
-    current_date = start_date
-    while current_date <= end_date:
-        if random.random() < 0.1:  # 10% chance of maintenance on any given day
-            maintenance = (
-                current_date,
-                fake.sentence(),
-                random.uniform(1000, 10000)  # cost
-            )
-            cursor.execute("INSERT INTO Maintenance (maintenance_date, description, cost) VALUES (%s, %s, %s)", maintenance)
-            maintenance_id = cursor.lastrowid
-            
-            # Randomly choose an asset for maintenance
-            asset_type = random.choice(['plant', 'line', 'substation', 'network'])
-            if asset_type == 'plant':
-                asset_id = random.choice(plant_ids)
-            elif asset_type == 'line':
-                asset_id = random.choice(line_ids)
-            elif asset_type == 'substation':
-                asset_id = random.choice(substation_ids)
-            else:
-                asset_id = random.choice(network_ids)
-            
-            cursor.execute("INSERT INTO Asset_Maintenance (maintenance_id, asset_id, asset_type) VALUES (%s, %s, %s)", 
-                           (maintenance_id, asset_id, asset_type))
-        
-        conn.commit()
-        current_date += timedelta(days=1)
+    write_rows(conn, "Maintenance", ["maintenance_id", "maintenance_date", "description", "cost"], maintenance,
+               commit=False)
+    write_rows(conn, "Asset_Maintenance", ["maintenance_id", "asset_id", "asset_type"], asset_maintenance, commit=False)
+    conn.commit()
 
-def generate_outages(start_date, end_date):
-    cursor.execute("SELECT plant_id FROM Power_Plants")
-    plant_ids = [row[0] for row in cursor.fetchall()]
+def generate_outages(conn, start_date, end_date):
+    cursor = conn.cursor()
+    days = event_days(start_date, end_date, 0.05)  # 5% chance of outage on any given day
+    asset_types, asset_ids = choose_assets(load_asset_ids(cursor), len(days))
     
-    cursor.execute("SELECT line_id FROM Transmission_Lines")
-    line_ids = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT customer_id FROM Customers")
+    customer_ids = [row[0] for row in cursor.fetchall()]
     
-    cursor.execute("SELECT substation_id FROM Substations")
-    substation_ids = [row[0] for row in cursor.fetchall()]
+    start_times = [day + timedelta(hours=random.randint(0, 23), minutes=random.randint(0, 59)) for day in days]
+    # Outage duration between 30 minutes and 8 hours
+    end_times = [start_time + timedelta(hours=random.uniform(0.5, 8)) for start_time in start_times]
     
-    cursor.execute("SELECT network_id FROM Distribution_Networks")
-    network_ids = [row[0] for row in cursor.fetchall()]
+    first_id = next_id(cursor, "Outages", "outage_id")
+    outage_ids = range(first_id, first_id + len(days))
+    outages = list(zip(outage_ids, start_times, end_times, [fake.sentence() for _ in days], asset_ids, asset_types))
     
-    current_date = start_date
-    while current_date <= end_date:
-        if random.random() < 0.05:  # 5% chance of outage on any given day
-            asset_type = random.choice(['plant', 'line', 'substation', 'network'])
-            if asset_type == 'plant':
-                asset_id = random.choice(plant_ids)
-            elif asset_type == 'line':
-                asset_id = random.choice(line_ids)
-            elif asset_type == 'substation':
-                asset_id = random.choice(substation_ids)
-            else:
-                asset_id = random.choice(network_ids)
-            
-            start_time = current_date + timedelta(hours=random.randint(0, 23), minutes=random.randint(0, 59))
-            duration = timedelta(hours=random.uniform(0.5, 8))  # Outage duration between 30 minutes and 8 hours
-            end_time = start_time + duration
-            
-            outage = (
-                start_time,
-                end_time,
-                fake.sentence(),
-                asset_id,
-                asset_type
-            )
-            cursor.execute("INSERT INTO Outages (start_time, end_time, description, asset_id, asset_type) VALUES (%s, %s, %s, %s, %s)", outage)
-            outage_id = cursor.lastrowid
-            
-            # Assign affected customers
-            cursor.execute("SELECT customer_id FROM Customers LIMIT %s", (random.randint(1, 1000),))
-            affected_customers = cursor.fetchall()
-            for customer in affected_customers:
-                cursor.execute("INSERT INTO Customer_Outage (outage_id, customer_id) VALUES (%s, %s)", (outage_id, customer[0]))
-        
-        conn.commit()
-        current_date += timedelta(days=1)
+    # Assign affected customers, sampled from the ids loaded up front
+    customer_outages = [(outage_id, customer_id) for outage_id in outage_ids
+                        for customer_id in random.sample(customer_ids, min(random.randint(1, 1000), len(customer_ids)))]
+    
+    write_rows(conn, "Outages", ["outage_id", "start_time", "end_time", "description", "asset_id", "asset_type"],
+               outages, commit=False)
+    write_rows(conn, "Customer_Outage", ["outage_id", "customer_id"], customer_outages, commit=False)
+    conn.commit()
+
+def run_task(function, *args):
+    # Run one load step on a connection checked out of the pool; closing a
+    # pooled connection hands it back
+    conn = pool.get_connection()
+    try:
+        function(conn, *args)
+    finally:
+        conn.close()
 
 # Main execution
 if __name__ == "__main__":
     start_date = datetime(2023, 1, 1)
     end_date = datetime(2023, 12, 31)
     
-    generate_power_plants(10)
-    generate_transmission_lines(20)
-    generate_substations(30)
-    link_transmission_substations()
-    generate_distribution_networks(50)
-    generate_customers(10000)
-    generate_meters(10000)
-    generate_energy_consumption(start_date, end_date)
-    generate_billing(start_date, end_date)
-    generate_maintenance(start_date, end_date)
-    generate_outages(start_date, end_date)
+    conn = pool.get_connection()
+    first_consumption_id = next_id(conn.cursor(), "Energy_Consumption", "consumption_id")
+    conn.close()
     
-    print("Data generation complete!")
-
-    conn.close()
\ No newline at end of file
+    consumption = consumption_tasks(generate_energy_consumption, start_date, end_date,
+                                    first_consumption_id, CONSUMPTION_CHUNK_DAYS)
+    assets = {"power_plants", "transmission_lines", "substations", "distribution_networks"}
+    run_load_plan({
+        "power_plants": (generate_power_plants, (10,), set()),
+        "transmission_lines": (generate_transmission_lines, (20,), {"power_plants"}),
+        "substations": (generate_substations, (30,), set()),
+        "transmission_substation": (link_transmission_substations, (), {"transmission_lines", "substations"}),
+        "distribution_networks": (generate_distribution_networks, (50,), {"substations"}),
+        "customers": (generate_customers, (10000,), {"distribution_networks"}),
+        "meters": (generate_meters, (10000,), {"customers"}),
+        **consumption,
+        "billing": (generate_billing, (start_date, end_date), set(consumption)),
+        "maintenance": (generate_maintenance, (start_date, end_date), assets),
+        "outages": (generate_outages, (start_date, end_date), assets | {"customers"}),
+    }, run_task, NUM_WORKERS)
+    
+    print("Data generation complete!")
\ No newline at end of file
@@ -2,8 +2,13 @@
 
 import psycopg2
 from psycopg2 import sql
+from psycopg2.pool import ThreadedConnectionPool
 from faker import Faker
+from dataload_common import (choose_assets, consumption_tasks, event_days, load_asset_ids,
+                             pipelined, run_load_plan)
 from datetime import datetime, timedelta
+import csv
+import io
 import random
 
 fake = Faker()
@@ -16,13 +21,49 @@ db_config = {
     'password': 'tiger123'
 }
 
-conn = psycopg2.connect(**db_config)
-cursor = conn.cursor()
+# Tables are loaded by NUM_WORKERS threads, each on its own pooled
+# connection (plus one for the main thread); Energy_Consumption is split into
+# tasks of CONSUMPTION_CHUNK_DAYS days each
+NUM_WORKERS = 4
+CONSUMPTION_CHUNK_DAYS = 30
+
+# Number of day batches of readings the generator may run ahead of the writer
+PIPELINE_QUEUE_DEPTH = 4
+
+pool = ThreadedConnectionPool(1, NUM_WORKERS + 1, **db_config)
 
 # Global dictionaries to store locations and city sizes
 locations = {}
 city_sizes = {}
 
+# Sizes of the name/street/zip vocabularies customers are sampled from
+IDENTITY_POOL_SIZE = 1000
+STREET_POOL_SIZE = 10000
+ZIPS_PER_CITY = 25
+
+
+def next_id(cursor, table, id_column):
+    # Ids are assigned client-side, starting after the table's current maximum
+    cursor.execute(sql.SQL("SELECT COALESCE(MAX({}), 0) + 1 FROM {}").format(sql.SQL(id_column), sql.SQL(table)))
+    return cursor.fetchone()[0]
+
+def copy_rows(cursor, table, columns, rows, id_column=None):
+    # Bulk-load rows with COPY FROM STDIN from an in-memory CSV buffer: one
+    # round trip per batch instead of one per row. None is written as an empty
+    # field, which COPY reads as NULL. With id_column set, the column's serial
+    # sequence (if it has one) is moved past the ids we assigned.
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+        sql.SQL(table), sql.SQL(', ').join(map(sql.SQL, columns))), buffer)
+    if id_column is not None:
+        sync_sequence(cursor, table, id_column)
+
+def sync_sequence(cursor, table, id_column):
+    # Move the column's serial sequence, if it has one, past the ids we assigned
+    cursor.execute(sql.SQL("SELECT setval(pg_get_serial_sequence(%s, %s), MAX({})) FROM {}").format(
+        sql.SQL(id_column), sql.SQL(table)), (table.lower(), id_column))
 
 def categorize_city_size(population):
     if population < 100000:
@@ -32,12 +73,15 @@ def categorize_city_size(population):
     else:
         return "large"
 
-def generate_power_plants(num_plants):
+def generate_power_plants(conn, num_plants):
+    cursor = conn.cursor()
+    first_id = next_id(cursor, "Power_Plants", "plant_id")
     plants = []
-    for _ in range(num_plants):
+    for plant_id in range(first_id, first_id + num_plants):
         city = fake.city()
         population = random.randint(10000, 5000000)
         plants.append((
+            plant_id,
             fake.company() + " Power Plant",
             random.uniform(100, 1000),  # capacity in MW
             city
@@ -45,29 +89,33 @@ def generate_power_plants(num_plants):
         locations[city] = fake.state()
         city_sizes[city] = categorize_city_size(population)
     
-    insert_query = sql.SQL("INSERT INTO Power_Plants (plant_name, capacity, location) VALUES (%s, %s, %s)")
-    cursor.executemany(insert_query, plants)
+    copy_rows(cursor, "Power_Plants", ["plant_id", "plant_name", "capacity", "location"], plants, "plant_id")
     conn.commit()
 
-def generate_transmission_lines(num_lines):
+def generate_transmission_lines(conn, num_lines):
+    cursor = conn.cursor()
     cursor.execute("SELECT plant_id FROM Power_Plants")
     plant_ids = [row[0] for row in cursor.fetchall()]
     
-    lines = [(fake.word() + " Line",
+    first_id = next_id(cursor, "Transmission_Lines", "line_id")
+    lines = [(line_id,
+              fake.word() + " Line",
               random.choice([69, 138, 230, 345, 500]),  # voltage in kV
               random.uniform(10, 300),  # length in km
-              random.choice(plant_ids)) for _ in range(num_lines)]
+              random.choice(plant_ids)) for line_id in range(first_id, first_id + num_lines)]
     
-    insert_query = sql.SQL("INSERT INTO Transmission_Lines (line_name, voltage, length, plant_id) VALUES (%s, %s, %s, %s)")
-    cursor.executemany(insert_query, lines)
+    copy_rows(cursor, "Transmission_Lines", ["line_id", "line_name", "voltage", "length", "plant_id"], lines, "line_id")
     conn.commit()
 
-def generate_substations(num_substations):
+def generate_substations(conn, num_substations):
+    cursor = conn.cursor()
+    first_id = next_id(cursor, "Substations", "substation_id")
     substations = []
-    for _ in range(num_substations):
+    for substation_id in range(first_id, first_id + num_substations):
         city = fake.city()
         population = random.randint(10000, 5000000)
         substations.append((
+            substation_id,
             fake.word() + " Substation",
             random.uniform(50, 500),  # capacity in MVA
             city
@@ -75,44 +123,60 @@ def generate_substations(num_substations):
         locations[city] = fake.state()
         city_sizes[city] = categorize_city_size(population)
     
-    insert_query = sql.SQL("INSERT INTO Substations (substation_name, capacity, location) VALUES (%s, %s, %s)")
-    cursor.executemany(insert_query, substations)
+    copy_rows(cursor, "Substations", ["substation_id", "substation_name", "capacity", "location"], substations,
+              "substation_id")
     conn.commit()
 
-def link_transmission_substations():
+def link_transmission_substations(conn):
+    cursor = conn.cursor()
     cursor.execute("SELECT line_id FROM Transmission_Lines")
     line_ids = [row[0] for row in cursor.fetchall()]
     
     cursor.execute("SELECT substation_id FROM Substations")
     substation_ids = [row[0] for row in cursor.fetchall()]
     
-    links = [(line_id, random.choice(substation_ids)) 
-             for line_id in line_ids 
-             for _ in range(random.randint(1, 3))]  # Each line connects to 1-3 substations
+    # Each line connects to 1-3 distinct substations (distinct, as (line_id, substation_id) is the key)
+    links = [(line_id, substation_id)
+             for line_id in line_ids
+             for substation_id in random.sample(substation_ids, min(random.randint(1, 3), len(substation_ids)))]
     
-    insert_query = sql.SQL("INSERT INTO Transmission_Substation (line_id, substation_id) VALUES (%s, %s)")
-    cursor.executemany(insert_query, links)
+    copy_rows(cursor, "Transmission_Substation", ["line_id", "substation_id"], links)
     conn.commit()
 
-def generate_distribution_networks(num_networks):
+def generate_distribution_networks(conn, num_networks):
+    cursor = conn.cursor()
     cursor.execute("SELECT substation_id, location FROM Substations")
     substation_data = cursor.fetchall()
     
+    first_id = next_id(cursor, "Distribution_Networks", "network_id")
     networks = []
-    for _ in range(num_networks):
+    for network_id in range(first_id, first_id + num_networks):
         substation_id, substation_location = random.choice(substation_data)
         networks.append((
+            network_id,
             fake.word() + " Network",
             random.choice([4.16, 13.8, 34.5]),  # voltage in kV
             substation_id,
             substation_location  # Add location to network data
         ))
     
-    insert_query = sql.SQL("INSERT INTO Distribution_Networks (network_name, voltage, substation_id, location) VALUES (%s, %s, %s, %s)")
-    cursor.executemany(insert_query, networks)
+    copy_rows(cursor, "Distribution_Networks", ["network_id", "network_name", "voltage", "substation_id", "location"],
+              networks, "network_id")
     conn.commit()
 
-def generate_customers(num_customers):
+def build_identity_pools(cities):
+    # Draw names, street addresses and per-city zip codes from Faker once;
+    # customers are then assembled from these pools instead of calling Faker
+    # several times per row
+    return {
+        'first_names': [fake.first_name() for _ in range(IDENTITY_POOL_SIZE)],
+        'last_names': [fake.last_name() for _ in range(IDENTITY_POOL_SIZE)],
+        'streets': [fake.street_address() for _ in range(STREET_POOL_SIZE)],
+        'zip_codes': {city: [fake.zipcode() for _ in range(ZIPS_PER_CITY)] for city in cities},
+    }
+
+def generate_customers(conn, num_customers):
+    cursor = conn.cursor()
     cursor.execute("SELECT network_id, location FROM Distribution_Networks")
     network_data = cursor.fetchall()
     
@@ -126,41 +190,69 @@ def generate_customers(num_customers):
         else:  # large
             weights.append(10)
     
-    customers = []
-    for _ in range(num_customers):
-        network_id, network_location = random.choices(network_data, weights=weights, k=1)[0]
-        state = locations.get(network_location, fake.state())
-        customers.append((
-            fake.name(),
-            fake.street_address() + ", " + network_location + ", " + state + " " + fake.zipcode(),
-            network_id
-        ))
+    network_locations = {location for _, location in network_data}
+    pools = build_identity_pools(network_locations)
+    states = {location: locations.get(location) or fake.state() for location in network_locations}
+    
+    # Sample every column for all customers at once, then zip them into rows
+    chosen_networks = random.choices(network_data, weights=weights, k=num_customers)
+    first_names = random.choices(pools['first_names'], k=num_customers)
+    last_names = random.choices(pools['last_names'], k=num_customers)
+    streets = random.choices(pools['streets'], k=num_customers)
+    zip_picks = random.choices(range(ZIPS_PER_CITY), k=num_customers)
     
-    insert_query = sql.SQL("INSERT INTO Customers (customer_name, address, network_id) VALUES (%s, %s, %s)")
-    cursor.executemany(insert_query, customers)
+    first_id = next_id(cursor, "Customers", "customer_id")
+    customers = [(
+        customer_id,
+        first_name + " " + last_name,
+        street + ", " + location + ", " + states[location] + " " + pools['zip_codes'][location][zip_pick],
+        network_id
+    ) for customer_id, (network_id, location), first_name, last_name, street, zip_pick
+        in zip(range(first_id, first_id + num_customers), chosen_networks, first_names, last_names, streets, zip_picks)]
+    
+    copy_rows(cursor, "Customers", ["customer_id", "customer_name", "address", "network_id"], customers, "customer_id")
     conn.commit()
 
-def generate_meters(num_meters):
+def generate_meters(conn, num_meters):
+    cursor = conn.cursor()
     cursor.execute("SELECT customer_id FROM Customers")
     customer_ids = [row[0] for row in cursor.fetchall()]
     
-    meters = [(random.choice(['Smart', 'Analog', 'Digital']),
+    first_id = next_id(cursor, "Meters", "meter_id")
+    meters = [(meter_id,
+               random.choice(['Smart', 'Analog', 'Digital']),
                fake.date_between(start_date='-5y', end_date='today'),
-               customer_id) for customer_id in customer_ids[:num_meters]]  # Ensure unique customer_id
+               customer_id) for meter_id, customer_id in zip(range(first_id, first_id + num_meters),
+                                                            customer_ids[:num_meters])]  # Ensure unique customer_id
     
-    insert_query = sql.SQL("INSERT INTO Meters (meter_type, installation_date, customer_id) VALUES (%s, %s, %s)")
-    cursor.executemany(insert_query, meters)
+    copy_rows(cursor, "Meters", ["meter_id", "meter_type", "installation_date", "customer_id"], meters, "meter_id")
     conn.commit()
 
-def generate_energy_consumption(start_date, end_date):
+def generate_energy_consumption(conn, start_date, end_date, first_id, first_date):
+    # Readings for start_date..end_date, one of several chunks of a load that
+    # may run side by side. Ids follow (day, meter) order counted from
+    # first_date and first_id, so chunks get disjoint ids without querying
+    # the table; the sequence is synced once all chunks are in.
+    cursor = conn.cursor()
     cursor.execute("""
         SELECT m.meter_id, dn.location 
         FROM Meters m
         JOIN Customers c ON m.customer_id = c.customer_id
         JOIN Distribution_Networks dn ON c.network_id = dn.network_id
+        ORDER BY m.meter_id
     """)
     meter_data = cursor.fetchall()
     
+    first_chunk_id = first_id + (start_date - first_date).days * len(meter_data)
+    batches = consumption_batches(meter_data, start_date, end_date, first_chunk_id)
+    for consumptions in pipelined(batches, PIPELINE_QUEUE_DEPTH):
+        # One COPY per day of readings
+        copy_rows(cursor, "Energy_Consumption", ["consumption_id", "meter_id", "reading_date", "consumption"],
+                  consumptions)
+        conn.commit()
+
+def consumption_batches(meter_data, start_date, end_date, consumption_id):
+    # One batch of readings per day, numbered from consumption_id
     current_date = start_date
     while current_date <= end_date:
         consumptions = []
@@ -174,147 +266,125 @@ def generate_energy_consumption(start_date, end_date):
                 consumption = base_consumption * random.uniform(1.6, 2.0)
             
             consumptions.append((
+                consumption_id,
                 meter_id,
                 current_date,
                 consumption
             ))
+            consumption_id += 1
         
-        insert_query = sql.SQL("INSERT INTO Energy_Consumption (meter_id, reading_date, consumption) VALUES (%s, %s, %s)")
-        cursor.executemany(insert_query, consumptions)
-        conn.commit()
+        yield consumptions
         current_date += timedelta(days=1)
 
-def generate_billing(start_date, end_date):
-    cursor.execute("SELECT customer_id FROM Customers")
-    customer_ids = [row[0] for row in cursor.fetchall()]
-    
-    current_date = start_date
-    while current_date <= end_date:
-        bills = []
-        for customer_id in customer_ids:
-            # Get the latest consumption for this customer
-            cursor.execute("""
-                SELECT ec.consumption_id, ec.consumption 
-                FROM Energy_Consumption ec
-                JOIN Meters m ON ec.meter_id = m.meter_id
-                WHERE m.customer_id = %s AND ec.reading_date = %s
-            """, (customer_id, current_date))
-            result = cursor.fetchone()
-            if result:
-                consumption_id, consumption = result
-                bills.append((customer_id,
-                              current_date,
-                              consumption * random.uniform(0.10, 0.15),  # amount in currency
-                              consumption_id))
-        
-        insert_query = sql.SQL("INSERT INTO Billing (customer_id, billing_date, amount, consumption_id) VALUES (%s, %s, %s, %s)")
-        cursor.executemany(insert_query, bills)
-        conn.commit()
-        current_date += timedelta(days=30)  # Monthly billing
+def sync_consumption_sequence(conn):
+    sync_sequence(conn.cursor(), "Energy_Consumption", "consumption_id")
+    conn.commit()
 
-def generate_maintenance(start_date, end_date):
-    cursor.execute("SELECT plant_id FROM Power_Plants")
-    plant_ids = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute("SELECT line_id FROM Transmission_Lines")
-    line_ids = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute("SELECT substation_id FROM Substations")
-    substation_ids = [row[0] for row in cursor.fetchall()]
+def generate_billing(conn, start_date, end_date):
+    cursor = conn.cursor()
+    # One set-based pass: each customer's consumption is summed per 30-day
+    # billing cycle by a single INSERT ... SELECT, so billing costs one scan of
+    # Energy_Consumption instead of a query per customer per cycle. A bill is
+    # dated on its cycle's last reading and references that reading.
+    cursor.execute("""
+        INSERT INTO Billing (bill_id, customer_id, billing_date, amount, consumption_id)
+        SELECT %(first_id)s + ROW_NUMBER() OVER (ORDER BY cycle, customer_id) - 1,
+               customer_id, billing_date, amount, consumption_id
+        FROM (
+            SELECT m.customer_id,
+                   (ec.reading_date - %(start_date)s::date) / 30 AS cycle,
+                   MAX(ec.reading_date) AS billing_date,
+                   SUM(ec.consumption) * (0.10 + random() * 0.05) AS amount,
+                   MAX(ec.consumption_id) AS consumption_id
+            FROM Energy_Consumption ec
+            JOIN Meters m ON ec.meter_id = m.meter_id
+            WHERE ec.reading_date BETWEEN %(start_date)s AND %(end_date)s
+            GROUP BY m.customer_id, cycle
+        ) cycles
+    """, {'first_id': next_id(cursor, "Billing", "bill_id"), 'start_date': start_date, 'end_date': end_date})
+    sync_sequence(cursor, "Billing", "bill_id")
+    conn.commit()
+
+def generate_maintenance(conn, start_date, end_date):
+    cursor = conn.cursor()
+    # All events are drawn up front with client-assigned ids, then the parent
+    # and junction tables are written as two bulk batches in one transaction
+    days = event_days(start_date, end_date, 0.1)  # 10% chance of maintenance on any given day
+    asset_types, asset_ids = choose_assets(load_asset_ids(cursor), len(days))
     
-    cursor.execute("SELECT network_id FROM Distribution_Networks")
-    network_ids = [row[0] for row in cursor.fetchall()]
+    first_id = next_id(cursor, "Maintenance", "maintenance_id")
+    maintenance_ids = range(first_id, first_id + len(days))
+    maintenance = list(zip(maintenance_ids,
+                           days,
+                           [fake.sentence() for _ in days],
+                           [random.uniform(1000, 10000) for _ in days]))  # cost
+    asset_maintenance = list(zip(maintenance_ids, asset_ids, asset_types))
     
-    current_date = start_date
-    while current_date <= end_date:
-        if random.random() < 0.1:  # 10% chance of maintenance on any given day
-            maintenance = (current_date,
-                           fake.sentence(),
-                           random.uniform(1000, 10000))  # cost
-            cursor.execute("INSERT INTO Maintenance (maintenance_date, description, cost) VALUES (%s, %s, %s) RETURNING maintenance_id", maintenance)
-            maintenance_id = cursor.fetchone()[0]
-            
-            # Randomly choose an asset for maintenance
-            asset_type = random.choice(['plant', 'line', 'substation', 'network'])
-            if asset_type == 'plant':
-                asset_id = random.choice(plant_ids)
-            elif asset_type == 'line':
-                asset_id = random.choice(line_ids)
-            elif asset_type == 'substation':
-                asset_id = random.choice(substation_ids)
-            else:
-                asset_id = random.choice(network_ids)
-            
-            cursor.execute("INSERT INTO Asset_Maintenance (maintenance_id, asset_id, asset_type) VALUES (%s, %s, %s)", 
-                           (maintenance_id, asset_id, asset_type))
-        
-        conn.commit()
-        current_date += timedelta(days=1)
+    copy_rows(cursor, "Maintenance", ["maintenance_id", "maintenance_date", "description", "cost"], maintenance,
+              "maintenance_id")
+    copy_rows(cursor, "Asset_Maintenance", ["maintenance_id", "asset_id", "asset_type"], asset_maintenance)
+    conn.commit()
 
-def generate_outages(start_date, end_date):
-    cursor.execute("SELECT plant_id FROM Power_Plants")
-    plant_ids = [row[0] for row in cursor.fetchall()]
+def generate_outages(conn, start_date, end_date):
+    cursor = conn.cursor()
+    days = event_days(start_date, end_date, 0.05)  # 5% chance of outage on any given day
+    asset_types, asset_ids = choose_assets(load_asset_ids(cursor), len(days))
     
-    cursor.execute("SELECT line_id FROM Transmission_Lines")
-    line_ids = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT customer_id FROM Customers")
+    customer_ids = [row[0] for row in cursor.fetchall()]
     
-    cursor.execute("SELECT substation_id FROM Substations")
-    substation_ids = [row[0] for row in cursor.fetchall()]
+    start_times = [day + timedelta(hours=random.randint(0, 23), minutes=random.randint(0, 59)) for day in days]
+    # Outage duration between 30 minutes and 8 hours
+    end_times = [start_time + timedelta(hours=random.uniform(0.5, 8)) for start_time in start_times]
     
-    cursor.execute("SELECT network_id FROM Distribution_Networks")
-    network_ids = [row[0] for row in cursor.fetchall()]
+    first_id = next_id(cursor, "Outages", "outage_id")
+    outage_ids = range(first_id, first_id + len(days))
+    outages = list(zip(outage_ids, start_times, end_times, [fake.sentence() for _ in days], asset_ids, asset_types))
     
-    current_date = start_date
-    while current_date <= end_date:
-        if random.random() < 0.05:  # 5% chance of outage on any given day
-            asset_type = random.choice(['plant', 'line', 'substation', 'network'])
-            if asset_type == 'plant':
-                asset_id = random.choice(plant_ids)
-            elif asset_type == 'line':
-                asset_id = random.choice(line_ids)
-            elif asset_type == 'substation':
-                asset_id = random.choice(substation_ids)
-            else:
-                asset_id = random.choice(network_ids)
-            
-            start_time = current_date + timedelta(hours=random.randint(0, 23), minutes=random.randint(0, 59))
-            duration = timedelta(hours=random.uniform(0.5, 8))  # Outage duration between 30 minutes and 8 hours
-            end_time = start_time + duration
-            
-            outage = (start_time,
-                      end_time,
-                      fake.sentence(),
-                      asset_id,
-                      asset_type)
-            cursor.execute("INSERT INTO Outages (start_time, end_time, description, asset_id, asset_type) VALUES (%s, %s, %s, %s, %s) RETURNING outage_id", outage)
-            outage_id = cursor.fetchone()[0]
-            
-            # Assign affected customers
-            cursor.execute("SELECT customer_id FROM Customers ORDER BY RANDOM() LIMIT %s", (random.randint(1, 1000),))
-            affected_customers = cursor.fetchall()
-            customer_outages = [(outage_id, customer[0]) for customer in affected_customers]
-            cursor.executemany("INSERT INTO Customer_Outage (outage_id, customer_id) VALUES (%s, %s)", customer_outages)
-        
-        conn.commit()
-        current_date += timedelta(days=1)
+    # Assign affected customers, sampled from the ids loaded up front
+    customer_outages = [(outage_id, customer_id) for outage_id in outage_ids
+                        for customer_id in random.sample(customer_ids, min(random.randint(1, 1000), len(customer_ids)))]
+    
+    copy_rows(cursor, "Outages", ["outage_id", "start_time", "end_time", "description", "asset_id", "asset_type"],
+              outages, "outage_id")
+    copy_rows(cursor, "Customer_Outage", ["outage_id", "customer_id"], customer_outages)
+    conn.commit()
+
+def run_task(function, *args):
+    # Run one load step on a connection checked out of the pool
+    conn = pool.getconn()
+    try:
+        function(conn, *args)
+    finally:
+        pool.putconn(conn)
 
 # Main execution
 if __name__ == "__main__":
     start_date = datetime(2023, 1, 1)
     end_date = datetime(2023, 12, 31)
     
-    generate_power_plants(10)
-    generate_transmission_lines(20)
-    generate_substations(30)
-    link_transmission_substations()
-    generate_distribution_networks(50)
-    generate_customers(10000)
-    generate_meters(10000)
-    generate_energy_consumption(start_date, end_date)
-    generate_billing(start_date, end_date)
-    generate_maintenance(start_date, end_date)
-    generate_outages(start_date, end_date)
+    conn = pool.getconn()
+    first_consumption_id = next_id(conn.cursor(), "Energy_Consumption", "consumption_id")
+    pool.putconn(conn)
+    
+    consumption = consumption_tasks(generate_energy_consumption, start_date, end_date,
+                                    first_consumption_id, CONSUMPTION_CHUNK_DAYS)
+    assets = {"power_plants", "transmission_lines", "substations", "distribution_networks"}
+    run_load_plan({
+        "power_plants": (generate_power_plants, (10,), set()),
+        "transmission_lines": (generate_transmission_lines, (20,), {"power_plants"}),
+        "substations": (generate_substations, (30,), set()),
+        "transmission_substation": (link_transmission_substations, (), {"transmission_lines", "substations"}),
+        "distribution_networks": (generate_distribution_networks, (50,), {"substations"}),
+        "customers": (generate_customers, (10000,), {"distribution_networks"}),
+        "meters": (generate_meters, (10000,), {"customers"}),
+        **consumption,
+        "consumption_sequence": (sync_consumption_sequence, (), set(consumption)),
+        "billing": (generate_billing, (start_date, end_date), {"consumption_sequence"}),
+        "maintenance": (generate_maintenance, (start_date, end_date), assets),
+        "outages": (generate_outages, (start_date, end_date), assets | {"customers"}),
+    }, run_task, NUM_WORKERS)
     
     print("Data generation complete!")
 
-    conn.close()
\ No newline at end of file
+    pool.closeall()
\ No newline at end of file